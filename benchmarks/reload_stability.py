@@ -0,0 +1,216 @@
+"""
+Reload the launcher batches many times under the offscreen Qt platform,
+and check that the number of Qt objects and the memory used stay flat.
+
+    python benchmarks/reload_stability.py --reloads 1000
+    python benchmarks/reload_stability.py --reloads 1000 --launcher
+
+With --launcher, Launcher.update() is driven instead of the view alone: discovery jobs run on
+batch directories whose batches_for_user is replaced by synthetic catalogs, jeanpaulstart must
+be installed. Jobs must not be kept alive once they answered.
+
+Exits with 1 if objects or memory grow.
+"""
+import os
+import gc
+import sys
+import time
+import argparse
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PySide6.QtCore import QObject, QEvent, QCoreApplication
+from PySide6.QtWidgets import QApplication
+
+from synthetic_catalog import make_batches
+
+
+class _Controller(object):
+    def batch_clicked(self, batch, option_name=None):
+        pass
+
+    def batch_hovered(self, batch, option_name=None):
+        pass
+
+    def cancel_run(self, run_id):
+        pass
+
+    def cancel_all_runs(self):
+        pass
+
+    def update(self):
+        pass
+
+
+def rss_bytes():
+    """ Resident memory of the process, from /proc when available.
+    """
+    try:
+        with open('/proc/self/statm') as statm_file:
+            return int(statm_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def qt_object_count(widget):
+    return len(widget.findChildren(QObject)) + len(QApplication.allWidgets())
+
+
+def flush_deletions():
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    QApplication.processEvents()
+
+
+def process_args():
+    parser = argparse.ArgumentParser(description="Check launcher reloads don't leak")
+    parser.add_argument('--reloads', type=int, default=1000, help="number of reloads")
+    parser.add_argument('--batches', type=int, default=200, help="number of batches per reload")
+    parser.add_argument('--warmup', type=int, default=20, help="reloads done before taking the reference")
+    parser.add_argument('--max-rss-growth', type=float, default=8.0, help="allowed memory growth, in MB")
+    parser.add_argument('--launcher', action='store_true', help="reload through Launcher.update()")
+    parser.add_argument('--directories', type=int, default=3, help="with --launcher, number of batch directories")
+    return parser.parse_args()
+
+
+def main():
+    args = process_args()
+    # keep window geometry and thumbnails out of the user's home
+    os.environ['HOME'] = tempfile.mkdtemp(prefix='jps-reload-')
+    os.environ['USERPROFILE'] = os.environ['HOME']
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    if args.launcher:
+        failures = reload_launcher(args)
+    else:
+        failures = reload_view(args)
+    app.quit()
+
+    if failures:
+        print('FAILED: ' + ', '.join(failures))
+        return 1
+    print('OK')
+    return 0
+
+
+def reload_view(args):
+    from jeanpaulstartui.view.launcher_widget import LauncherWidget
+
+    view = LauncherWidget()
+    view.controller = _Controller()
+
+    catalogs = [
+        make_batches(args.batches, seed=0),
+        make_batches(args.batches, seed=1, prefix='Other'),
+        make_batches(args.batches // 2, seed=0)
+    ]
+
+    def reload(index):
+        view.populate_layout(catalogs[index % len(catalogs)], reconcile=bool(index % 2))
+        flush_deletions()
+        view.batches_layout.heightForWidth(view.width())
+
+    for index in range(args.warmup):
+        reload(index)
+
+    reference_objects = qt_object_count(view)
+    reference_items = view.batches_layout.count()
+    reference_rss = rss_bytes()
+
+    for index in range(args.warmup, args.warmup + args.reloads):
+        reload(index)
+        if index % 100 == 0:
+            print('reload {0}: {1} objects, {2} layout items, {3:.1f} MB'.format(
+                index, qt_object_count(view), view.batches_layout.count(), rss_bytes() / 1048576.0
+            ))
+
+    # end on the same catalog, in the same mode, as the reference
+    reload(args.warmup - 1)
+
+    objects = qt_object_count(view)
+    items = view.batches_layout.count()
+    rss_growth = (rss_bytes() - reference_rss) / 1048576.0
+
+    print('objects: {0} -> {1}'.format(reference_objects, objects))
+    print('layout items: {0} -> {1}'.format(reference_items, items))
+    print('rss growth: {0:.1f} MB'.format(rss_growth))
+
+    failures = list()
+    if objects > reference_objects:
+        failures.append('Qt objects grew by {0}'.format(objects - reference_objects))
+    if items != reference_items:
+        failures.append('layout items went from {0} to {1}'.format(reference_items, items))
+    if rss_growth > args.max_rss_growth:
+        failures.append('memory grew by {0:.1f} MB'.format(rss_growth))
+
+    view.close()
+    return failures
+
+
+def reload_launcher(args):
+    import jeanpaulstart
+    from jeanpaulstartui.launcher import Launcher
+    from jeanpaulstartui.utils.batch_discovery import DirectoryDiscovery
+
+    directories = list()
+    catalogs = dict()
+    for index in range(args.directories):
+        directory = tempfile.mkdtemp(prefix='jps-reload-batches-')
+        with open(os.path.join(directory, 'batch.yml'), 'w') as batch_file:
+            batch_file.write('synthetic')
+        directories.append(directory)
+        catalogs[directory] = make_batches(args.batches // args.directories, seed=index, prefix='Dir{0}'.format(index))
+
+    # no batch file is parsed, only the launcher machinery runs
+    jeanpaulstart.load_plugins = lambda: None
+    jeanpaulstart.batches_for_user = lambda batch_directories, **kwargs: list(catalogs[batch_directories[0]])
+
+    launcher = Launcher()
+    launcher.batch_directories = directories
+    launcher.username = 'reload_stability'
+
+    def reload(index):
+        # a changed directory is parsed again, the others reuse their catalog entry
+        changed_filepath = os.path.join(directories[index % len(directories)], 'batch.yml')
+        os.utime(changed_filepath, (time.time(), time.time() + index))
+        launcher.update()
+        while launcher._discoveries:
+            QApplication.processEvents()
+            time.sleep(0.001)
+        flush_deletions()
+
+    def alive_discoveries():
+        gc.collect()
+        return sum(1 for instance in gc.get_objects() if isinstance(instance, DirectoryDiscovery))
+
+    for index in range(args.warmup):
+        reload(index)
+
+    reference_rss = rss_bytes()
+    for index in range(args.warmup, args.warmup + args.reloads):
+        reload(index)
+        if index % 100 == 0:
+            print('reload {0}: {1} discovery jobs alive, {2:.1f} MB'.format(
+                index, alive_discoveries(), rss_bytes() / 1048576.0
+            ))
+
+    discoveries = alive_discoveries()
+    rss_growth = (rss_bytes() - reference_rss) / 1048576.0
+    print('discovery jobs alive: {0}'.format(discoveries))
+    print('rss growth: {0:.1f} MB'.format(rss_growth))
+
+    failures = list()
+    if discoveries:
+        failures.append('{0} discovery jobs kept alive'.format(discoveries))
+    if rss_growth > args.max_rss_growth:
+        failures.append('memory grew by {0:.1f} MB'.format(rss_growth))
+
+    launcher._view.close()
+    return failures
+
+
+if __name__ == '__main__':
+    sys.exit(main())
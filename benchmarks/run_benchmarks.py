@@ -0,0 +1,346 @@
+"""
+Time the launcher view on synthetic catalogs, under the offscreen Qt platform.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --batches 100 1000 5000 --compare 4.1.1-d9252cf
+
+Results are written to benchmarks/results/<label>.json, the label being the version of setup.py
+followed by the git revision of the tree (and -dirty if it has uncommitted changes), unless --label is given. With --compare, each timing is compared with the stored results of another
+version, and the command exits with 1 if one is slower than --tolerance.
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import subprocess
+import statistics
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, _ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import PySide6
+from PySide6.QtCore import QObject, QEvent, QRect, QCoreApplication
+from PySide6.QtWidgets import QApplication, QWidget
+
+from synthetic_catalog import make_batches, write_batch_directory
+
+
+RESULTS_DIRECTORY = os.path.join(_ROOT, 'benchmarks', 'results')
+WIDTHS = (400, 800, 1600)
+# below, timings are mostly noise
+COMPARED_MIN_MS = 0.05
+
+
+class _Controller(object):
+    def batch_clicked(self, batch, option_name=None):
+        pass
+
+    def batch_hovered(self, batch, option_name=None):
+        pass
+
+    def cancel_run(self, run_id):
+        pass
+
+    def cancel_all_runs(self):
+        pass
+
+    def update(self):
+        pass
+
+
+class _FirstPaint(QObject):
+    """ Tell when a widget got its first paint event.
+    """
+    def __init__(self):
+        QObject.__init__(self)
+        self.painted_at = None
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and self.painted_at is None:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def _setup_version():
+    with open(os.path.join(_ROOT, 'setup.py')) as setup_file:
+        return re.search(r"VERSION = '([^']+)'", setup_file.read()).group(1)
+
+
+def _default_label():
+    """ The version of setup.py isn't bumped by every change, the revision tells which code was measured.
+    """
+    version = _setup_version()
+    try:
+        revision = subprocess.check_output(
+            ['git', 'describe', '--always', '--dirty', '--abbrev=7'], cwd=_ROOT, stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return version
+    return '{0}-{1}'.format(version, revision.decode().strip())
+
+
+def _flush_deletions():
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    QApplication.processEvents()
+
+
+def _wait(condition, timeout=60.0):
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            raise RuntimeError("benchmark timed out")
+        QApplication.processEvents()
+        time.sleep(0.001)
+
+
+def _new_view(virtual_view=False):
+    from jeanpaulstartui.view.launcher_widget import LauncherWidget
+    view = LauncherWidget(virtual_view=virtual_view)
+    view.controller = _Controller()
+    return view
+
+
+def _close_view(view):
+    view.close()
+    view.deleteLater()
+    _flush_deletions()
+
+
+class Suite(object):
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = dict()
+
+    def measure(self, name, function, setup=None):
+        """ Time function `repeat` times, after an untimed warm up call.
+        setup is called, untimed, before each call.
+        """
+        function(setup() if setup is not None else None)
+        durations = list()
+        for _ in range(self.repeat):
+            argument = setup() if setup is not None else None
+            start = time.perf_counter()
+            function(argument)
+            durations.append((time.perf_counter() - start) * 1000.0)
+        self.results[name] = {
+            'median_ms': statistics.median(durations),
+            'min_ms': min(durations),
+            'repeat': self.repeat
+        }
+        print('{0:<48} median {1:10.3f} ms   min {2:10.3f} ms'.format(
+            name, self.results[name]['median_ms'], self.results[name]['min_ms']
+        ))
+
+
+def bench_populate_layout(suite, count, icon_directory):
+    batches = write_batch_directory(icon_directory, count, seed=0)
+    changed_batches = list(batches)
+    changed_batches[::10] = make_batches(len(changed_batches[::10]), seed=1, prefix='Changed')
+
+    view = _new_view()
+
+    def rebuild(_):
+        view.populate_layout(batches, reconcile=False)
+
+    def reconcile(_):
+        view.populate_layout(changed_batches)
+
+    def reset(_=None):
+        view.populate_layout(batches, reconcile=False)
+        _flush_deletions()
+
+    suite.measure('populate_layout/rebuild/{0}'.format(count), rebuild, setup=_flush_deletions)
+    suite.measure('populate_layout/reconcile_10pct/{0}'.format(count), reconcile, setup=reset)
+    reset()
+    suite.measure('populate_layout/reconcile_same/{0}'.format(count), lambda _: view.populate_layout(batches))
+
+    def rebuild_and_polish(_):
+        view.populate_layout(batches, reconcile=False)
+        for widget in view.findChildren(QWidget):
+            widget.ensurePolished()
+
+    suite.measure('populate_layout/rebuild_and_polish/{0}'.format(count), rebuild_and_polish, setup=_flush_deletions)
+
+    layout = view.batches_layout
+    for width in WIDTHS:
+        rect = QRect(0, 0, width, 0)
+        suite.measure(
+            'flow_layout/do_layout/{0}/{1}px'.format(count, width),
+            lambda _: layout.do_layout(rect, test_only=False),
+            setup=layout.invalidate
+        )
+        suite.measure(
+            'flow_layout/heightForWidth/{0}/{1}px'.format(count, width),
+            lambda _: layout.heightForWidth(width),
+            setup=layout.invalidate
+        )
+        suite.measure(
+            'flow_layout/heightForWidth_cached/{0}/{1}px'.format(count, width),
+            lambda _: layout.heightForWidth(width)
+        )
+
+    _close_view(view)
+
+
+def bench_icons(suite, icon_directory, thumbnail_directory):
+    from jeanpaulstartui.utils.icon_cache import IconCache
+
+    icon_paths = sorted(
+        os.path.join(icon_directory, filename).replace('\\', '/')
+        for filename in os.listdir(icon_directory)
+        if filename.endswith('.png')
+    )
+
+    def load_all(icon_cache):
+        pending = set(icon_paths)
+        for icon_path in icon_paths:
+            icon_cache.request(icon_path, 64, lambda pixmap, icon_path=icon_path: pending.discard(icon_path))
+        _wait(lambda: not pending)
+
+    def without_thumbnails():
+        shutil.rmtree(thumbnail_directory, ignore_errors=True)
+        return IconCache()
+
+    def with_thumbnails():
+        return IconCache()
+
+    suite.measure('icons/decode/{0}'.format(len(icon_paths)), load_all, setup=without_thumbnails)
+    suite.measure('icons/thumbnails/{0}'.format(len(icon_paths)), load_all, setup=with_thumbnails)
+    icon_cache = IconCache()
+    load_all(icon_cache)
+    suite.measure('icons/memory/{0}'.format(len(icon_paths)), load_all, setup=lambda: icon_cache)
+
+
+def bench_window_cache(suite):
+    from jeanpaulstartui.utils import window_cache
+
+    view = _new_view()
+    suite.measure('window_cache/save', lambda _: window_cache.save_window_geometry(view))
+    suite.measure('window_cache/restore', lambda _: window_cache.restore_window_geometry(view))
+    _close_view(view)
+
+
+def bench_first_paint(suite, count, virtual_view, icon_directory):
+    batches = write_batch_directory(icon_directory, count, seed=0)
+    first_paints = list()
+
+    def first_paint(_):
+        first_paint_filter = _FirstPaint()
+        start = time.perf_counter()
+        view = _new_view(virtual_view=virtual_view)
+        view.installEventFilter(first_paint_filter)
+        view.populate_layout(batches)
+        _wait(lambda: first_paint_filter.painted_at is not None)
+        first_paints.append((view, first_paint_filter))
+        return first_paint_filter.painted_at - start
+
+    def close_views():
+        while first_paints:
+            _close_view(first_paints.pop()[0])
+
+    suite.measure(
+        'first_paint/{0}/{1}'.format('virtual' if virtual_view else 'buttons', count),
+        first_paint,
+        setup=close_views
+    )
+    close_views()
+
+
+def compare(results, reference, tolerance):
+    """ Print how each timing changed since the reference results.
+    Minimum timings are compared, they are the least disturbed by the other processes of the machine.
+
+    Returns:
+        list: Names of the timings slower than the tolerance
+    """
+    regressions = list()
+    print('\ncompared with {0}:'.format(reference['version']))
+    for name, result in sorted(results['results'].items()):
+        reference_result = reference['results'].get(name)
+        if reference_result is None or reference_result['min_ms'] < COMPARED_MIN_MS:
+            continue
+        ratio = result['min_ms'] / reference_result['min_ms']
+        flag = ''
+        if ratio > 1.0 + tolerance:
+            flag = '  SLOWER'
+            regressions.append(name)
+        print('{0:<48} {1:10.3f} -> {2:10.3f} ms  x{3:.2f}{4}'.format(
+            name, reference_result['min_ms'], result['min_ms'], ratio, flag
+        ))
+    return regressions
+
+
+def process_args():
+    parser = argparse.ArgumentParser(description="Benchmark the launcher view on synthetic catalogs")
+    parser.add_argument('--batches', type=int, nargs='+', default=[100, 1000], help="catalog sizes")
+    parser.add_argument('--repeat', type=int, default=7, help="number of timings of each benchmark")
+    parser.add_argument('--label', help="name of the results, <setup.py version>-<git revision> by default")
+    parser.add_argument('--no-save', action='store_true', help="don't write the results")
+    parser.add_argument('--compare', metavar='VERSION', help="compare with the stored results named VERSION")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slow down, 0.2 being 20%%")
+    return parser.parse_args()
+
+
+def main():
+    args = process_args()
+    # keep window geometry and thumbnails out of the user's home
+    home = tempfile.mkdtemp(prefix='jps-benchmarks-')
+    os.environ['HOME'] = home
+    os.environ['USERPROFILE'] = home
+    icon_directory = os.path.join(home, 'icons')
+    thumbnail_directory = os.path.join(home, '.jeanpaulstart', 'thumbnails')
+
+    from jeanpaulstartui.view.stylesheet import apply_stylesheet
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    apply_stylesheet(app)
+    suite = Suite(args.repeat)
+
+    for count in args.batches:
+        bench_populate_layout(suite, count, icon_directory)
+    bench_icons(suite, icon_directory, thumbnail_directory)
+    bench_window_cache(suite)
+    for count in args.batches:
+        bench_first_paint(suite, count, False, icon_directory)
+        bench_first_paint(suite, count, True, icon_directory)
+
+    results = {
+        'version': args.label or _default_label(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pyside': PySide6.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'results': suite.results
+    }
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        results_filepath = os.path.join(RESULTS_DIRECTORY, results['version'] + '.json')
+        with open(results_filepath, 'w') as results_file:
+            json.dump(results, results_file, indent=2, sort_keys=True)
+        print('\nresults written to {0}'.format(results_filepath))
+
+    regressions = list()
+    if args.compare:
+        with open(os.path.join(RESULTS_DIRECTORY, args.compare + '.json')) as reference_file:
+            regressions = compare(results, json.load(reference_file), args.tolerance)
+
+    app.quit()
+    shutil.rmtree(home, ignore_errors=True)
+
+    if regressions:
+        print('FAILED: {0} timings slower than {1:.0%}'.format(len(regressions), args.tolerance))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
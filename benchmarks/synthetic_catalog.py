@@ -0,0 +1,117 @@
+"""
+Synthetic batches, to exercise the launcher without batch files nor jeanpaulstart parsing.
+"""
+import os
+import zlib
+import struct
+import random
+
+
+DEFAULT_ICON_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'jeanpaulstartui', 'resources', 'ceci-n-est-pas-une-icone.png'
+).replace('\\', '/')
+DEFAULT_ICON_SIZES = (32, 128, 512, 2048)
+
+
+class SyntheticOption(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class SyntheticBatch(object):
+    """ Has the attributes of a jeanpaulstart batch read by the launcher view.
+    """
+    def __init__(self, name, icon_path=DEFAULT_ICON_PATH, description='', version=None,
+                 options=None, stagings=None, old_versions=None, tags=None):
+        self.name = name
+        self.icon_path = icon_path
+        self.description = description
+        self.version = version
+        self.options = options or list()
+        self.stagings = stagings
+        self.old_versions = old_versions or list()
+        self.tags = tags or list()
+
+
+def make_batches(count, seed=0, icon_paths=None, prefix='Batch'):
+    """ Make batches, with a mix of plain batches, batches with options,
+    batches with stagings and versioned batches with old versions.
+
+    Args:
+        count (int): Number of batches
+        seed (int): Seed of the random generator, the same seed gives the same batches
+        icon_paths (list): Icons to pick from
+        prefix (str): Prefix of the batch names
+
+    Returns:
+        list: SyntheticBatch
+    """
+    generator = random.Random(seed)
+    icon_paths = icon_paths or [DEFAULT_ICON_PATH]
+    batches = list()
+
+    for index in range(count):
+        name = '{0} {1:05d}'.format(prefix, index)
+        kind = index % 4
+        batch = SyntheticBatch(
+            name=name,
+            icon_path=generator.choice(icon_paths),
+            description='Launch {0}'.format(name),
+            tags=['tag{0}'.format(generator.randint(0, 20))]
+        )
+        if kind == 1:
+            batch.options = [SyntheticOption('option {0}'.format(i)) for i in range(generator.randint(1, 5))]
+        elif kind == 2:
+            batch.version = '1.{0}.0'.format(generator.randint(0, 9))
+            batch.stagings = ['dev', 'staging', 'prod']
+        elif kind == 3:
+            batch.version = '2.{0}.0'.format(generator.randint(0, 9))
+            batch.old_versions = ['1.{0}.0'.format(i) for i in range(generator.randint(1, 30))]
+        batches.append(batch)
+
+    return batches
+
+
+def write_png(filepath, size, color):
+    """ Write a square PNG of a single color, without Qt.
+    """
+    def chunk(chunk_type, data):
+        return struct.pack('>I', len(data)) + chunk_type + data + \
+            struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff)
+
+    row = b'\x00' + bytes(color) * size
+    with open(filepath, 'wb') as png_file:
+        png_file.write(b'\x89PNG\r\n\x1a\n')
+        png_file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0)))
+        png_file.write(chunk(b'IDAT', zlib.compress(row * size)))
+        png_file.write(chunk(b'IEND', b''))
+
+
+def write_batch_directory(directory, count, seed=0, icon_sizes=DEFAULT_ICON_SIZES, icons_per_size=4, prefix='Batch'):
+    """ Write the icons of a synthetic catalog, and make its batches.
+    Icons are shared by several batches, as in production.
+
+    Args:
+        directory (str): Directory the icons are written to, created if needed
+        count (int): Number of batches
+        seed (int): Seed of the random generator, the same seed gives the same catalog
+        icon_sizes (tuple): Sizes, in pixels, of the icons
+        icons_per_size (int): Number of distinct icons of each size
+        prefix (str): Prefix of the batch names
+
+    Returns:
+        list: SyntheticBatch, with icon paths in the directory
+    """
+    generator = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    icon_paths = list()
+    for size in icon_sizes:
+        for index in range(icons_per_size):
+            icon_path = os.path.join(directory, 'icon_{0}_{1}.png'.format(size, index)).replace('\\', '/')
+            if not os.path.isfile(icon_path):
+                write_png(icon_path, size, [generator.randint(0, 255) for _ in range(3)])
+            icon_paths.append(icon_path)
+
+    return make_batches(count, seed=seed, icon_paths=icon_paths, prefix=prefix)
@@ -1,18 +1,26 @@
 import sys
-import os.path
-import tempfile
-import subprocess
 
 
-if __name__ == '__main__':
-    main_filepath = os.path.join(os.path.dirname(__file__), 'main.py')
+def run(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] == 'headless':
+        # no Qt at all in headless mode
+        from jeanpaulstartui.headless import main as headless_main
+        return headless_main(argv[1:])
+
+    if argv and argv[0] == 'report':
+        from jeanpaulstartui.telemetry_report import main as report_main
+        return report_main(argv[1:])
 
-    if '--save-logs' in sys.argv:
-        sys.argv.remove('--save-logs')
-        log_filepath = os.path.join(tempfile.gettempdir(), 'jeanpaulstart.log')
-        command = [sys.executable, main_filepath] + sys.argv[1:] + ['>', log_filepath, '2>&1']
+    # a launcher already runs for the user: don't pay for the start of another one
+    from jeanpaulstartui.utils.single_instance import forward_to_running_instance
+    if forward_to_running_instance(argv):
+        return 0
 
-    else:
-        command = [sys.executable, main_filepath] + sys.argv[1:]
+    from jeanpaulstartui.main import main
+    return main(argv)
 
-    sys.exit(subprocess.call(' '.join(command), shell=True))
+
+if __name__ == '__main__':
+    sys.exit(run())
@@ -0,0 +1,117 @@
+import os
+import time
+import getpass
+import logging
+import argparse
+import threading
+
+
+DIRECTORY_CHECK_TIMEOUT = 2.0
+
+
+def _is_readable_directory(directory):
+    return os.path.isdir(directory) and os.access(directory, os.R_OK)
+
+
+def check_directories(directories, timeout=DIRECTORY_CHECK_TIMEOUT):
+    """ Check directories are readable, all at once, each in a daemon thread:
+    a hung network mount can't block the others, nor the process for longer than timeout.
+
+    Returns:
+        tuple: (readable directories, directories that didn't answer in time), in the given order
+    """
+    results = dict()
+
+    def check(directory):
+        results[directory] = _is_readable_directory(directory)
+
+    threads = list()
+    for directory in directories:
+        thread = threading.Thread(target=check, args=(directory,), name='jps-check-directory', daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    readable_directories = list()
+    unreachable_directories = list()
+    for directory in directories:
+        if directory not in results:
+            unreachable_directories.append(directory)
+        elif results[directory]:
+            readable_directories.append(directory)
+    return readable_directories, unreachable_directories
+
+
+class ReadableDirectory(argparse.Action):
+    """ Keep the readable directories of a ';' separated list.
+    Directories that don't answer within DIRECTORY_CHECK_TIMEOUT are kept: a slow mount
+    may answer later, the launcher gives up on them for a single scan only.
+    """
+    def __call__(self, parser, namespace, values, option_string=None):
+        directories = values.split(';')
+        valid_directories, unreachable_directories = check_directories(directories)
+
+        for directory in directories:
+            if directory in unreachable_directories:
+                logging.warning('ReadableDirectory:{0} didn\'t answer within {1}s, kept anyway'.format(
+                    directory, DIRECTORY_CHECK_TIMEOUT
+                ))
+            elif directory not in valid_directories:
+                logging.warning('ReadableDirectory:{0} is not a valid path'.format(directory))
+
+        setattr(namespace, self.dest, [
+            directory for directory in directories
+            if directory in valid_directories or directory in unreachable_directories
+        ])
+
+
+class ReadableFilePath(argparse.Action):
+    def __call__(self, parser, namespace, values, option_string=None):
+        file_path = values
+
+        if not os.path.isfile(file_path):
+            raise argparse.ArgumentError(self, 'ReadableFilePath:{0} is not a valid path'.format(file_path))
+
+        if os.access(file_path, os.R_OK):
+            setattr(namespace, self.dest, file_path)
+        else:
+            raise argparse.ArgumentError(self, 'ReadableFilePath:{0} is not a valid path'.format(file_path))
+
+
+def add_batch_arguments(parser):
+    """ Add the arguments needed to resolve the batches of a user.
+    They are shared by the launcher and the headless mode.
+    """
+    parser.add_argument(
+        '-b',
+        '--batches',
+        action=ReadableDirectory,
+        required=True,
+        help="path to batch directory"
+    )
+    parser.add_argument(
+        '-t',
+        '--tags',
+        action=ReadableFilePath,
+        help="path to tags config"
+    )
+    parser.add_argument(
+        '-e',
+        '--elastic',
+        help='url of the elasticsearch server (i.e http://192.0.9.171:9200/)'
+    )
+    parser.add_argument(
+        '-i',
+        '--elastic-index',
+        help='index prefix for the team'
+    )
+    parser.add_argument(
+        '-u',
+        '--username',
+        type=str,
+        default=getpass.getuser().lower(),
+        help="username (default: current user login name)"
+    )
@@ -0,0 +1,131 @@
+"""
+List and run batches without Qt, for farm scripts and onboarding tools.
+
+    python -m jeanpaulstartui headless --batches /path/to/batches --list --json
+    python -m jeanpaulstartui headless --batches /path/to/batches --run "Maya" --option 2022
+
+PySide6 is never imported by this module.
+"""
+import sys
+import json
+import logging
+import argparse
+
+import jeanpaulstart
+from jeanpaulstartui.arguments import add_batch_arguments
+from jeanpaulstartui.utils.execution import error_as_status, iterate_steps
+
+
+EXIT_SUCCESS = 0
+EXIT_BATCH_FAILED = 1
+EXIT_BATCH_NOT_FOUND = 3
+
+
+def process_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='jeanpaulstartui headless',
+        description="Jean-Paul Start - list and run batches without user interface"
+    )
+    add_batch_arguments(parser)
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument(
+        '-l',
+        '--list',
+        action='store_true',
+        help="print the batches of the user"
+    )
+    action.add_argument(
+        '-r',
+        '--run',
+        metavar='BATCH_NAME',
+        help="run the batch named BATCH_NAME"
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help="with --list, print the batches as JSON"
+    )
+    parser.add_argument(
+        '--option',
+        help="with --run, option, staging or version to run"
+    )
+    return parser.parse_args(argv)
+
+
+def batch_as_dict(batch):
+    return {
+        'name': batch.name,
+        'version': batch.version,
+        'description': batch.description,
+        'icon_path': batch.icon_path,
+        'tags': list(getattr(batch, 'tags', None) or list()),
+        'options': [option.name for option in batch.options or list()],
+        'stagings': list(batch.stagings) if batch.stagings is not None else None,
+        'old_versions': list(batch.old_versions or list())
+    }
+
+
+def list_batches(batches, as_json=False, stream=sys.stdout):
+    if as_json:
+        json.dump([batch_as_dict(batch) for batch in batches], stream, indent=2)
+        stream.write('\n')
+        return
+
+    for batch in batches:
+        if batch.version:
+            stream.write('{0} ({1})\n'.format(batch.name, batch.version))
+        else:
+            stream.write('{0}\n'.format(batch.name))
+
+
+def run_batch(batch, option_name=None, stream=sys.stdout):
+    """ Run a batch, writing the progress of each task to the stream.
+
+    Returns:
+        int: EXIT_SUCCESS or EXIT_BATCH_FAILED
+    """
+    try:
+        executor = jeanpaulstart.Executor(batch, option_name)
+        for task_name, progress in iterate_steps(executor):
+            stream.write('[{0:3.0f}%] {1}\n'.format(progress * 100, task_name))
+            stream.flush()
+    except Exception as exc:
+        logging.exception("Headless: {0} failed".format(batch.name))
+        stream.write('[fail] {0}\n'.format(exc))
+        return EXIT_BATCH_FAILED
+
+    if not executor.success:
+        stream.write('[fail] {0}\n'.format(error_as_status(executor)))
+        return EXIT_BATCH_FAILED
+
+    stream.write('[100%] done\n')
+    return EXIT_SUCCESS
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.WARNING)
+    args = process_args(argv)
+
+    jeanpaulstart.load_plugins()
+    batches = jeanpaulstart.batches_for_user(
+        batch_directories=args.batches,
+        username=args.username,
+        tags_filepath=args.tags,
+        elasticsearch_url=args.elastic,
+        elasticsearch_index=args.elastic_index
+    )
+
+    if args.list:
+        list_batches(batches, as_json=args.json)
+        return EXIT_SUCCESS
+
+    batch = next((batch for batch in batches if batch.name == args.run), None)
+    if batch is None:
+        sys.stderr.write("No batch named {0} for {1}\n".format(args.run, args.username))
+        return EXIT_BATCH_NOT_FOUND
+
+    return run_batch(batch, args.option or batch.version)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,51 +1,404 @@
-import jeanpaulstart
-from jeanpaulstartui.utils.hourglass_context import HourglassContext
+import functools
+import itertools
+import threading
+
+from PySide6.QtCore import QThreadPool, QTimer
+
+from jeanpaulstartui.utils.batch_run import BatchRun, CANCELLED_MESSAGE
+from jeanpaulstartui.utils.batch_discovery import DirectoryDiscovery
+from jeanpaulstartui.utils.batch_watcher import BatchWatcher
+from jeanpaulstartui.utils.elasticsearch_gate import DEFAULT_BUDGET, DEFAULT_TTL
+from jeanpaulstartui.utils.batch_catalog_cache import batch_signature, catalog_key, load_catalog, save_catalog
+from jeanpaulstartui.utils.startup_profiler import get_profiler
+from jeanpaulstartui.utils.usage_history import UsageHistory
+from jeanpaulstartui.utils.launch_telemetry import LaunchTelemetry
+from jeanpaulstartui.utils.executor_prewarm import ExecutorPrewarm
+from jeanpaulstartui.utils.launcher_session import LauncherSession
 from jeanpaulstartui.view.launcher_widget import LauncherWidget
 
 
-def _error_as_status(executor):
-    return executor.messages[-1].replace('][', ' : ')
+DEFAULT_DISCOVERY_TIMEOUT = 30.0
+
+
+def _run_title(batch, option_name):
+    if option_name and option_name != batch.version:
+        return '{0} ({1})'.format(batch.name, option_name)
+    return batch.name
 
 
 class Launcher(object):
 
-    def __init__(self):
-        self._view = LauncherWidget()
+    def __init__(self, virtual_view=False, release_menus=False):
+        self._view = LauncherWidget(virtual_view=virtual_view, release_menus=release_menus)
         self._view.controller = self
+        self._thread_pool = QThreadPool()
+        self._run_ids = itertools.count(1)
+        self._runs = dict()
+        self._discovery_generation = 0
+        self._discoveries = dict()
+        self._discovery_count = 0
+        self._discovered = dict()
+        self._hung_directories = dict()
+        self._revalidating = False
+        self._watcher = None
+        self._pending_launch = None
+        self._catalog = dict()
+        self.session = LauncherSession()
+        self._degraded_notes = dict()
+        self.usage_history = UsageHistory()
+        self.usage_history.load()
+        self._view.set_batch_priorities(self.usage_history.counts)
+        self.most_used_first = False
+        self.telemetry = LaunchTelemetry()
+        self.telemetry.load()
+        self.prewarm = ExecutorPrewarm()
+        self.batches = list()
         self.batch_directories = list()
+        self.discovery_timeout = DEFAULT_DISCOVERY_TIMEOUT
         self.tags_filepath = None
         self.elasticsearch_url = None
         self.elasticsearch_index_prefix = None
+        self.elasticsearch_budget = DEFAULT_BUDGET
+        self.elasticsearch_ttl = DEFAULT_TTL
         self.username = None
         self.version = "unknown"
 
-    def update(self):
-        jeanpaulstart.load_plugins()
-        batches = jeanpaulstart.batches_for_user(
-            batch_directories=self.batch_directories,
-            username=self.username,
-            tags_filepath=self.tags_filepath,
-            elasticsearch_url=self.elasticsearch_url,
-            elasticsearch_index=self.elasticsearch_index_prefix
+    def restore_catalog(self):
+        """ Show the batches of the cached catalog, before any discovery.
+
+        Returns:
+            bool: True if a cached catalog matching the arguments was found
+        """
+        self._catalog = load_catalog(self._current_catalog_key()) or dict()
+        if not self._catalog:
+            return False
+
+        self.batches = self._ordered_batches(
+            {directory: entry['batches'] for directory, entry in self._catalog.items()}
+        )
+        self._view.populate_layout(self.batches)
+        return True
+
+    def update(self, use_catalog=False):
+        """ Start the discovery of the batches, one background job per batch directory.
+
+        If no batch is shown yet, batches are handed to the view as soon as a directory answers,
+        the final ordering (by batch directory) is applied once every directory answered.
+        Otherwise, shown batches are revalidated and the view is only updated if something changed.
+
+        Directories whose batch files didn't change are not parsed again if the tags file didn't change
+        since the last update either, unless batches are resolved with Elasticsearch.
+
+        Args:
+            use_catalog (bool): If True, directories whose batch files didn't change since the
+                catalog was cached are not parsed again
+        """
+        self.session.load_plugins()
+        tags_changed = self.session.tags_changed(self.tags_filepath)
+        use_catalog = use_catalog or not (tags_changed or self.elasticsearch_url)
+        self._start_discoveries(self.batch_directories, use_catalog=use_catalog, revalidate=bool(self.batches))
+
+    def reload_directories(self, directories):
+        """ Revalidate some batch directories only, other directories keep their batches.
+        Directories whose batch files didn't change are not parsed again.
+
+        Args:
+            directories (list): Batch directories to revalidate
+        """
+        if self._discoveries or not self.batches:
+            self.update()
+            return
+
+        self._start_discoveries(directories, use_catalog=True, revalidate=True)
+
+    def watch(self, poll_interval=None):
+        """ Reload batches when batch files or the tags file change.
+
+        Args:
+            poll_interval (float): If given, directories are polled every poll_interval seconds
+                instead of being watched (network mounts)
+        """
+        self._watcher = BatchWatcher(self.batch_directories, self.tags_filepath, poll_interval=poll_interval)
+        self._watcher.directories_changed.connect(self.reload_directories)
+        self._watcher.tags_changed.connect(self.update)
+        self._watcher.start()
+
+    def _start_discoveries(self, directories, use_catalog, revalidate):
+        self._discovery_generation += 1
+        self._discoveries = dict()
+        self._discovery_count = len(directories)
+        self._revalidating = revalidate
+        self._degraded_notes = dict()
+        if self._revalidating:
+            self._discovered = {directory: entry['batches'] for directory, entry in self._catalog.items()}
+        else:
+            self._discovered = dict()
+
+        if not directories:
+            self._discovery_finished()
+            return
+
+        elasticsearch_gate = self.session.elasticsearch_gate(self.elasticsearch_url, self.elasticsearch_budget)
+        hung_directories = list()
+        for directory in directories:
+            if directory in self._hung_directories:
+                # its last discovery is still blocked by the file system, don't block another thread
+                hung_directories.append(directory)
+                self._discoveries[directory] = None
+                continue
+
+            discovery = DirectoryDiscovery(
+                generation=self._discovery_generation,
+                directory=directory,
+                username=self.username,
+                tags_filepath=self.tags_filepath,
+                elasticsearch_url=self.elasticsearch_url,
+                elasticsearch_index=self.elasticsearch_index_prefix,
+                last_entry=self._catalog.get(directory),
+                reuse_last_entry=use_catalog,
+                elasticsearch_gate=elasticsearch_gate,
+                elasticsearch_ttl=self.elasticsearch_ttl,
+                query_budget=self.elasticsearch_budget
+            )
+            discovery.signals.started.connect(self._directory_started)
+            discovery.signals.found.connect(self._directory_found)
+            discovery.signals.failed.connect(self._directory_failed)
+            discovery.signals.degraded.connect(self._directory_degraded)
+            self._discoveries[directory] = discovery
+            # a discovery blocked by a hung mount can't keep the process alive, unlike a thread pool
+            threading.Thread(target=discovery.run, name='jps-discovery', daemon=True).start()
+        self._view.set_status_message(self._discovery_status())
+
+        for directory in hung_directories:
+            self._directory_unreachable(directory)
+
+    def _current_catalog_key(self):
+        return catalog_key(self.batch_directories, self.username, self.tags_filepath)
+
+    def _ordered_batches(self, batches_by_directory):
+        batches = [
+            batch
+            for directory in self.batch_directories
+            for batch in batches_by_directory.get(directory, list())
+        ]
+        if self.most_used_first:
+            return self.usage_history.most_used_first(batches)
+        return batches
+
+    def _discovery_status(self):
+        return "Looking for batches... ({0}/{1})".format(
+            self._discovery_count - len(self._discoveries),
+            self._discovery_count
+        )
+
+    def _directory_started(self, generation, directory):
+        if generation != self._discovery_generation:
+            return
+        QTimer.singleShot(
+            int(self.discovery_timeout * 1000),
+            functools.partial(self._directory_timed_out, generation, directory)
         )
-        self._view.populate_layout(batches)
+
+    def _directory_timed_out(self, generation, directory):
+        if generation != self._discovery_generation or directory not in self._discoveries:
+            return
+        # the discovery can't be stopped: it is kept until it answers, and its result is dropped
+        self._hung_directories[directory] = self._discoveries[directory]
+        self._directory_unreachable(directory)
+
+    def _directory_unreachable(self, directory):
+        self._degraded_notes[directory] = "{0} didn't answer within {1:g}s".format(
+            directory, self.discovery_timeout
+        )
+        self._directory_lost(directory)
+
+    def _directory_found(self, generation, directory, entry):
+        self._hung_directories.pop(directory, None)
+        if generation != self._discovery_generation or directory not in self._discoveries:
+            # superseded, or timed out: the next reload will use it
+            return
+
+        self._discoveries.pop(directory, None)
+        if entry['batches'] is None:
+            entry['batches'] = self._catalog[directory]['batches']
+        self._catalog[directory] = entry
+        self._directory_answered(directory, entry['batches'])
+
+    def _directory_degraded(self, generation, directory, message):
+        if generation != self._discovery_generation or directory not in self._discoveries:
+            return
+        self._degraded_notes[directory] = message
+
+    def _directory_failed(self, generation, directory, message):
+        self._hung_directories.pop(directory, None)
+        if generation != self._discovery_generation or directory not in self._discoveries:
+            return
+        self._directory_lost(directory)
+
+    def _directory_lost(self, directory):
+        self._discoveries.pop(directory, None)
+        if self._revalidating and directory in self._catalog:
+            # keep showing the batches known for this directory
+            batches = self._catalog[directory]['batches']
+        else:
+            batches = list()
+        self._directory_answered(directory, batches)
+
+    def _directory_answered(self, directory, batches):
+        if self._revalidating:
+            self._discovered[directory] = batches
+            self._apply_discovered()
+        else:
+            is_first = not self._discovered
+            self._discovered[directory] = batches
+            if batches:
+                self._view.populate_layout(batches, append=not is_first)
+            elif is_first:
+                self._view.populate_layout(list())
+
+        if self._discoveries:
+            self._view.set_status_message(self._discovery_status())
+        else:
+            self._discovery_finished()
+
+    def _apply_discovered(self):
+        batches = self._ordered_batches(self._discovered)
+        if [batch_signature(batch) for batch in batches] != [batch_signature(batch) for batch in self.batches]:
+            self._view.populate_layout(batches)
+        self.batches = batches
+
+    def _discovery_finished(self):
+        if self._revalidating:
+            self._apply_discovered()
+        else:
+            arrival_order = [batch for batches in self._discovered.values() for batch in batches]
+            self.batches = self._ordered_batches(self._discovered)
+            if self.batches != arrival_order or not self.batches:
+                self._view.populate_layout(self.batches)
+
+        if not self.batches:
+            self._view.show_placeholder('No batch found')
+
         self._view.set_version("version " + self.version)
+        if self._degraded_notes:
+            self._view.set_status_message('{0} - version {1}'.format(
+                ', '.join(sorted(set(self._degraded_notes.values()))), self.version
+            ))
+        get_profiler().event('discovery_finished')
+        if self._pending_launch is not None:
+            self.launch(*self._pending_launch)
+        save_catalog(
+            self._current_catalog_key(),
+            {
+                directory: self._catalog[directory]
+                for directory in self.batch_directories
+                if directory in self._catalog
+            }
+        )
 
     def show(self):
         self._view.show()
 
+    def execute_command(self, command, arguments):
+        """ Execute a command sent by another invocation of the launcher.
+
+        Args:
+            command (str): 'show', 'reload' or 'launch'
+            arguments (list): For 'launch', the batch name and optionally the option name
+        """
+        if command == 'show':
+            self._view.showNormal()
+            self._view.raise_()
+        elif command == 'reload':
+            self._view.reload_batches()
+        elif command == 'launch' and arguments:
+            self._view.showNormal()
+            self.launch(*arguments[:2])
+
+    def launch(self, batch_name, option_name=None):
+        """ Launch a batch by its name. If batches are being discovered, it is launched once they are.
+        """
+        if self._discoveries:
+            self._pending_launch = (batch_name, option_name)
+            return
+        self._pending_launch = None
+
+        batch = next((batch for batch in self.batches if batch.name == batch_name), None)
+        if batch is None:
+            self._view.set_status_message('Unknown batch : {0}'.format(batch_name))
+            return
+
+        self.batch_clicked(batch, option_name or batch.version)
+
+    def batch_hovered(self, batch, option_name=None):
+        self.prewarm.prepare(batch, option_name)
+
     def batch_clicked(self, batch, option_name=None):
-        with HourglassContext(self._view):
-            executor = jeanpaulstart.Executor(batch, option_name)
-            while not executor.has_stopped:
-                self._view.set_status_message(executor.next_task.name)
-                self._view.set_progress(executor.progress)
-                self._view.refresh()
-                executor.step()
-
-            if not executor.success:
-                self._view.set_status_message(_error_as_status(executor))
-            else:
-                self._view.set_status_message(self.version)
+        # shown batches aren't moved under the cursor, the new order is applied on next reload
+        self.usage_history.record(batch.name, option_name)
+
+        estimate = self.telemetry.estimate(batch.name, option_name)
+        run = BatchRun(
+            next(self._run_ids), batch, option_name,
+            estimate=estimate, executor=self.prewarm.take(batch, option_name)
+        )
+        run.signals.status.connect(self._run_status)
+        run.signals.progress.connect(self._run_progress)
+        run.signals.finished.connect(self._run_finished)
+
+        self._runs[run.run_id] = run
+        self._view.add_run(run.run_id, _run_title(batch, option_name))
+        self._thread_pool.start(run.run)
+
+    def cancel_run(self, run_id):
+        run = self._runs.get(run_id)
+        if run is not None:
+            run.cancel()
+
+    def cancel_all_runs(self):
+        for run in self._runs.values():
+            run.cancel()
+
+    def _run_status(self, run_id, message):
+        run = self._runs.get(run_id)
+        if run is None or run.is_cancelled:
+            return
+
+        if len(self._runs) > 1:
+            message = '{0} : {1}'.format(run.batch.name, message)
+        self._view.set_status_message(message)
+
+    def _run_progress(self, run_id, value, remaining_time):
+        run = self._runs.get(run_id)
+        if run is None or run.is_cancelled:
+            return
+        self._view.set_progress(value)
+        self._view.set_remaining_time(remaining_time if remaining_time >= 0 else None)
+
+    def _run_finished(self, run_id, success, message):
+        run = self._runs.pop(run_id, None)
+        self._view.remove_run(run_id)
+        if run is None:
+            return
+
+        self.telemetry.record({
+            'batch': run.batch.name,
+            'option': run.option_name,
+            'username': self.username,
+            'started_at': run.started_at,
+            'duration': run.duration,
+            'success': success,
+            'cancelled': message == CANCELLED_MESSAGE,
+            'tasks': run.task_durations
+        })
+
+        if message == CANCELLED_MESSAGE:
+            self._view.set_status_message('{0} : {1}'.format(run.batch.name, CANCELLED_MESSAGE))
+        elif not success:
+            self._view.set_status_message(message)
+        elif not self._runs:
+            self._view.set_status_message(self.version)
+
+        if not self._runs:
             self._view.set_progress(0)
-            self._view.refresh()
+            self._view.set_remaining_time(None)
@@ -1,81 +1,122 @@
-import os
+import time
+_IMPORTS_WALL_START = time.perf_counter()
+_IMPORTS_CPU_START = time.process_time()
+
 import sys
 import logging
-import getpass
+import functools
 import argparse
 
 from PySide6.QtGui import *
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import *
 
-from jeanpaulstartui import ROOT
-from jeanpaulstartui.launcher import Launcher
-
-
-class ReadableDirectory(argparse.Action):
-    def __call__(self, parser, namespace, values, option_string=None):
-        directories = values.split(';')
-        valid_directories = list()
-
-        for directory in directories:
-            if not os.path.isdir(directory):
-                logging.warning('ReadableDirectory:{0} is not a valid path'.format(directory))
-                continue
-
-            if os.access(directory, os.R_OK):
-                valid_directories.append(directory)
-
-            else:
-                logging.warn('ReadableDirectory:{0} is not a valid path'.format(directory))
-
-        setattr(namespace, self.dest, valid_directories)
-
-
-class ReadableFilePath(argparse.Action):
-    def __call__(self, parser, namespace, values, option_string=None):
-        file_path = values
-
-        if not os.path.isfile(file_path):
-            raise argparse.ArgumentError(self, 'ReadableFilePath:{0} is not a valid path'.format(file_path))
+from jeanpaulstartui.arguments import add_batch_arguments
+from jeanpaulstartui.launcher import DEFAULT_DISCOVERY_TIMEOUT, Launcher
+from jeanpaulstartui.utils.single_instance import InstanceServer
+from jeanpaulstartui.utils.elasticsearch_gate import DEFAULT_BUDGET, DEFAULT_TTL
+from jeanpaulstartui.utils.logs import LOG_FILENAME, LOG_LEVELS, save_logs, start_logging
+from jeanpaulstartui.utils.startup_profiler import enable_profiler, get_profiler
+from jeanpaulstartui.view.stylesheet import apply_stylesheet
 
-        if os.access(file_path, os.R_OK):
-            setattr(namespace, self.dest, file_path)
-        else:
-            raise argparse.ArgumentError(self, 'ReadableFilePath:{0} is not a valid path'.format(file_path))
+_IMPORTS_WALL_END = time.perf_counter()
+_IMPORTS_CPU_END = time.process_time()
 
 
-def process_args():
+def process_args(argv=None):
     parser = argparse.ArgumentParser(description="Jean-Paul Start - Cube's Launcher")
+    add_batch_arguments(parser)
+    parser.add_argument(
+        '--elastic-budget',
+        type=float,
+        default=DEFAULT_BUDGET,
+        metavar='SECONDS',
+        help="time Elasticsearch has to answer before the last known batches are used (default: %(default)s)"
+    )
+    parser.add_argument(
+        '--elastic-ttl',
+        type=float,
+        default=DEFAULT_TTL,
+        metavar='SECONDS',
+        help="time batches resolved with Elasticsearch are reused on reload if no batch file changed "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        '--release-menus',
+        action='store_true',
+        help="delete the entries of batch menus once closed, for batches with long version histories"
+    )
+    parser.add_argument(
+        '--scan-timeout',
+        type=float,
+        default=DEFAULT_DISCOVERY_TIMEOUT,
+        metavar='SECONDS',
+        help="time a batch directory has to be scanned before it is reported as unreachable and skipped "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        '-w',
+        '--watch',
+        action='store_true',
+        help="reload batches when batch files or the tags file change"
+    )
     parser.add_argument(
-        '-b',
-        '--batches',
-        action=ReadableDirectory,
-        required=True,
-        help="path to batch directory"
+        '--watch-poll',
+        type=float,
+        metavar='SECONDS',
+        help="with --watch, poll the batch directories every SECONDS instead of watching them (network mounts)"
     )
     parser.add_argument(
-        '-t',
-        '--tags',
-        action=ReadableFilePath,
-        help="path to tags config"
+        '--single-instance',
+        action='store_true',
+        help="if a launcher already runs for the user, send it the command and exit"
     )
     parser.add_argument(
-        '-e',
-        '--elastic',
-        help='url of the elasticsearch server (i.e http://192.0.9.171:9200/)'
+        '--reload',
+        action='store_true',
+        help="with --single-instance, reload the batches of the running launcher"
     )
     parser.add_argument(
-        '-i',
-        '--elastic-index',
-        help='index prefix for the team'
+        '--launch',
+        metavar='BATCH_NAME',
+        help="launch the batch named BATCH_NAME"
     )
     parser.add_argument(
-        '-u',
-        '--username',
-        type=str,
-        default=getpass.getuser().lower(),
-        help="username (default: current user login name)"
+        '--option',
+        help="with --launch, option, staging or version to launch"
     )
-    parse_args = parser.parse_args()
+    parser.add_argument(
+        '--save-logs',
+        action='store_true',
+        help="write logs to a size rotated {0} file in the temporary directory".format(LOG_FILENAME)
+    )
+    parser.add_argument(
+        '--log-level',
+        choices=LOG_LEVELS,
+        type=str.upper,
+        help="level of the logs (default: DEBUG with --save-logs, WARNING otherwise)"
+    )
+    parser.add_argument(
+        '--profile-startup',
+        metavar='REPORT_PATH',
+        help="write the wall and CPU times of the startup phases as JSON to REPORT_PATH"
+    )
+    parser.add_argument(
+        '--profile-startup-cprofile',
+        metavar='STATS_PATH',
+        help="with --profile-startup, also dump cProfile stats of the startup to STATS_PATH"
+    )
+    parser.add_argument(
+        '--most-used-first',
+        action='store_true',
+        help="show the batches launched the most first"
+    )
+    parser.add_argument(
+        '--virtual-view',
+        action='store_true',
+        help="paint batches in a virtualized grid instead of creating a button per batch, for large catalogs"
+    )
+    parse_args = parser.parse_args(argv)
     return parse_args
 
 
@@ -86,24 +127,65 @@ def _set_package_logger():
     logging.getLogger("urllib3").setLevel(logging.INFO)
 
 
-if __name__ == '__main__':
-    log = logging.getLogger()
-    log.setLevel(logging.DEBUG)
+def main(argv=None):
     _set_package_logger()
-    args = process_args()
-
-    app = QApplication(sys.argv)
-    with open(ROOT + '/resources/stylesheet.css', 'r') as f_stylesheet:
-        stylesheet = str(f_stylesheet.read())
-    app.setStyleSheet(stylesheet)
-
-    launcher = Launcher()
+    args = process_args(argv)
+    log_level = args.log_level or ('DEBUG' if args.save_logs else 'WARNING')
+    # with --save-logs, the console only gets warnings, the log file has the rest
+    start_logging(log_level, console_level=logging.WARNING if args.save_logs else logging.NOTSET)
+    if args.save_logs:
+        save_logs()
+
+    if args.profile_startup:
+        profiler = enable_profiler(
+            args.profile_startup,
+            cprofile_filepath=args.profile_startup_cprofile,
+            origin=_IMPORTS_WALL_START,
+            cpu_origin=_IMPORTS_CPU_START
+        )
+        profiler.record(
+            'imports',
+            _IMPORTS_WALL_START, _IMPORTS_CPU_START,
+            wall_end=_IMPORTS_WALL_END, cpu_end=_IMPORTS_CPU_END
+        )
+        profiler.wait_for('first_paint', 'discovery_finished')
+        profiler.start_cprofile()
+    profiler = get_profiler()
+
+    with profiler.phase('QApplication'):
+        app = QApplication(sys.argv)
+
+    with profiler.phase('stylesheet'):
+        apply_stylesheet(app)
+
+    with profiler.phase('Launcher'):
+        launcher = Launcher(virtual_view=args.virtual_view, release_menus=args.release_menus)
     launcher.batch_directories = args.batches
+    launcher.discovery_timeout = args.scan_timeout
     launcher.tags_filepath = args.tags
     launcher.elasticsearch_url = args.elastic
     launcher.elasticsearch_index_prefix = args.elastic_index
+    launcher.elasticsearch_budget = args.elastic_budget
+    launcher.elasticsearch_ttl = args.elastic_ttl
     launcher.username = args.username
-    launcher.update()
+    launcher.most_used_first = args.most_used_first
+    with profiler.phase('restore_catalog'):
+        launcher.restore_catalog()
     launcher.show()
+    QTimer.singleShot(0, functools.partial(launcher.update, use_catalog=True))
+    if args.watch:
+        QTimer.singleShot(0, functools.partial(launcher.watch, poll_interval=args.watch_poll))
+    if args.launch:
+        QTimer.singleShot(0, functools.partial(launcher.launch, args.launch, args.option))
 
-    app.exec()
+    if args.single_instance:
+        instance_server = InstanceServer(args.username, app)
+        instance_server.command_received.connect(launcher.execute_command)
+        if not instance_server.listen():
+            logging.warning("Another launcher runs for {0}, this one won't receive commands".format(args.username))
+
+    return app.exec()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Summarize the launches recorded by the launcher: p50, p95 and max durations per batch and per task.
+
+    python -m jeanpaulstartui report
+    python -m jeanpaulstartui report --batch Maya --json
+
+PySide6 is never imported by this module.
+"""
+import sys
+import json
+import argparse
+
+from jeanpaulstartui.utils.launch_telemetry import load_records, summarize
+
+
+def process_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='jeanpaulstartui report',
+        description="Jean-Paul Start - durations of the recorded launches"
+    )
+    parser.add_argument(
+        '--batch',
+        metavar='BATCH_NAME',
+        help="only summarize the launches of the batch named BATCH_NAME"
+    )
+    parser.add_argument(
+        '--file',
+        metavar='TELEMETRY_PATH',
+        help="telemetry file to read instead of the one of the current user"
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help="print the summary as JSON"
+    )
+    return parser.parse_args(argv)
+
+
+def _format_duration(seconds):
+    if seconds is None:
+        return '-'
+    return '{0:.2f}s'.format(seconds)
+
+
+def _format_stats(stats):
+    return 'p50 {0:>8}  p95 {1:>8}  max {2:>8}'.format(
+        _format_duration(stats['p50']),
+        _format_duration(stats['p95']),
+        _format_duration(stats['max'])
+    )
+
+
+def print_summary(summary, stream=sys.stdout):
+    for batch in sorted(summary['batches']):
+        stats = summary['batches'][batch]
+        stream.write('{0:<32} {1:>4} ok {2:>4} failed  {3}\n'.format(
+            batch, stats['count'], stats['failures'], _format_stats(stats)
+        ))
+        tasks = summary['tasks'].get(batch, dict())
+        for task_name in sorted(tasks, key=lambda task_name: -(tasks[task_name]['p50'] or 0)):
+            stream.write('    {0:<46}  {1}\n'.format(task_name, _format_stats(tasks[task_name])))
+
+
+def main(argv=None):
+    args = process_args(argv)
+
+    records = load_records(args.file)
+    if args.batch:
+        records = (record for record in records if record['batch'] == args.batch)
+    summary = summarize(records)
+
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        print_summary(summary)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
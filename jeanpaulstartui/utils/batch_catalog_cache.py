@@ -0,0 +1,153 @@
+import os
+import pickle
+import logging
+
+
+BATCH_CATALOG_CACHE_FILE = "jps_batch_catalog.pickle"
+BATCH_CATALOG_CACHE_VERSION = 2
+
+
+def catalog_key(batch_directories, username, tags_filepath):
+    """ Build the key a catalog is stored with.
+    A cached catalog is only used if the launcher is started with the same key.
+
+    Args:
+        batch_directories (list): Batch directories given with --batches
+        username (str): User the batches are resolved for
+        tags_filepath (str): Path of the tags file given with --tags
+
+    Returns:
+        dict: The catalog key
+    """
+    return {
+        'batch_directories': [directory.replace('\\', '/') for directory in batch_directories],
+        'username': username,
+        'tags_filepath': tags_filepath,
+        'tags_mtime': _mtime(tags_filepath) if tags_filepath else None
+    }
+
+
+def directory_fingerprint(directory):
+    """ Get the modification time of every file in a batch directory.
+
+    Args:
+        directory (str): Batch directory
+
+    Returns:
+        dict: {relative file path: modification time}
+    """
+    fingerprint = dict()
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            filepath = os.path.join(root, filename)
+            relative_filepath = os.path.relpath(filepath, directory).replace('\\', '/')
+            fingerprint[relative_filepath] = _mtime(filepath)
+    return fingerprint
+
+
+def batch_signature(batch):
+    """ Get what is shown of a batch, to compare a cached batch with a freshly parsed one.
+    """
+    return (
+        batch.name,
+        batch.version,
+        batch.icon_path,
+        batch.description,
+        tuple(option.name for option in batch.options or list()),
+        tuple(batch.stagings) if batch.stagings is not None else None,
+        tuple(batch.old_versions or list())
+    )
+
+
+def load_catalog(key):
+    """ Load the cached catalog if it was saved with the given key.
+
+    Returns:
+        dict: {directory: {'fingerprint': dict, 'batches': list, 'elasticsearch': bool, 'resolved_at': float}}
+            or None
+    """
+    cache = _get_cache()
+
+    if not cache or cache.get('key') != key:
+        return None
+
+    return cache['directories']
+
+
+def save_catalog(key, directories):
+    """ Save the catalog.
+
+    Args:
+        key (dict): Key built with catalog_key()
+        directories (dict): {directory: {'fingerprint': dict, 'batches': list, 'elasticsearch': bool,
+            'resolved_at': float}}
+    """
+    catalog_cache_filepath = _get_batch_catalog_cache_filepath()
+
+    os.makedirs(os.path.dirname(catalog_cache_filepath), exist_ok=True)
+
+    try:
+        catalog_cache = pickle.dumps({
+            'version': BATCH_CATALOG_CACHE_VERSION,
+            'key': key,
+            'directories': directories
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as exc:
+        # batches may hold objects that can't be pickled
+        logging.error("JPS UI: Fail to serialize batch catalog.  exc: {}".format(exc))
+        return
+
+    try:
+        temporary_filepath = catalog_cache_filepath + '.tmp'
+        with open(temporary_filepath, 'wb') as cache_file:
+            cache_file.write(catalog_cache)
+        os.replace(temporary_filepath, catalog_cache_filepath)
+    except OSError:
+        logging.error("JPS UI: Can't write batch catalog cache file.")
+
+
+def _get_cache():
+    catalog_cache_filepath = _get_batch_catalog_cache_filepath()
+    logging.info("searching batch catalog from pref: {}".format(catalog_cache_filepath))
+
+    if not os.path.isfile(catalog_cache_filepath):
+        return None
+
+    try:
+        with open(catalog_cache_filepath, 'rb') as cache_file:
+            cache = pickle.load(cache_file)
+
+        if not isinstance(cache, dict) or cache.get('version') != BATCH_CATALOG_CACHE_VERSION:
+            logging.info("JPS UI: Batch catalog cache is outdated, ignoring it.")
+            return None
+
+        return cache
+
+    except OSError as exc:
+        logging.error("JPS UI: Can't read batch catalog cache file.  exc: {}".format(exc))
+        return None
+
+    except Exception as exc:
+        # Truncated or corrupted file, or batches saved by another version of jeanpaulstart.
+        logging.error("JPS UI: Can't decode batch catalog cache file.  exc: {}".format(exc))
+
+        try:
+            os.remove(catalog_cache_filepath)
+        except Exception:
+            logging.error("Can't delete corrupted batch catalog cache file")
+
+        return None
+
+
+def _mtime(filepath):
+    try:
+        return os.path.getmtime(filepath)
+    except OSError:
+        return None
+
+
+def _get_batch_catalog_cache_filepath():
+    return os.path.join(
+        os.path.expanduser('~/.jeanpaulstart'),
+        BATCH_CATALOG_CACHE_FILE
+    ).replace('\\', '/')
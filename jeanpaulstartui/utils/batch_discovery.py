@@ -0,0 +1,145 @@
+import time
+import logging
+
+from PySide6.QtCore import QObject, Signal
+
+import jeanpaulstart
+from jeanpaulstartui.utils.batch_catalog_cache import directory_fingerprint
+from jeanpaulstartui.utils.elasticsearch_gate import BudgetExceeded, call_with_budget
+from jeanpaulstartui.utils.startup_profiler import get_profiler
+
+
+class DirectoryDiscoverySignals(QObject):
+    started = Signal(int, str)
+    found = Signal(int, str, object)
+    failed = Signal(int, str, str)
+    degraded = Signal(int, str, str)
+
+
+class DirectoryDiscovery(object):
+    """ Resolve the batches of a single batch directory, outside of the GUI thread.
+
+    `run` is meant to be the target of a daemon thread.
+
+    `found` is emitted with a catalog entry: {'fingerprint', 'batches', 'elasticsearch', 'resolved_at'}.
+    `generation` is sent back with the result so the receiver can drop results
+    of a discovery that has been superseded (F5 pressed again).
+    `started` is emitted once the job runs, for the receiver to start its deadline.
+
+    The directory isn't parsed again, and `found` is emitted with None as batches, if no batch file
+    changed since `last_entry` and `reuse_last_entry` is True. With Elasticsearch, the entry must
+    also have been resolved with it less than `elasticsearch_ttl` seconds ago, `reuse_last_entry` or not.
+    If Elasticsearch doesn't answer within the gate budget, `degraded` is emitted and the last
+    batches resolved with Elasticsearch are used, or the batches are resolved without it.
+    If batches_for_user takes more than `query_budget` seconds and Elasticsearch doesn't answer a new
+    gate check, the last batches resolved with Elasticsearch are used too. Otherwise the time went to
+    parsing the batch files, and the answer is awaited: jeanpaulstart is never called twice at once.
+    """
+    def __init__(self, generation, directory, username, tags_filepath,
+                 elasticsearch_url=None, elasticsearch_index=None, last_entry=None, reuse_last_entry=False,
+                 elasticsearch_gate=None, elasticsearch_ttl=0, query_budget=None):
+        self.generation = generation
+        self.directory = directory
+        self.username = username
+        self.tags_filepath = tags_filepath
+        self.elasticsearch_url = elasticsearch_url
+        self.elasticsearch_index = elasticsearch_index
+        self.last_entry = last_entry
+        self.reuse_last_entry = reuse_last_entry
+        self.elasticsearch_gate = elasticsearch_gate
+        self.elasticsearch_ttl = elasticsearch_ttl
+        self.query_budget = query_budget
+        self.signals = DirectoryDiscoverySignals()
+
+    def run(self):
+        self.signals.started.emit(self.generation, self.directory)
+        try:
+            fingerprint = directory_fingerprint(self.directory)
+            if self._can_reuse_last_entry(fingerprint):
+                self._emit_found(fingerprint, None, self.last_entry.get('elasticsearch', False))
+                return
+
+            use_elasticsearch = bool(self.elasticsearch_url)
+            if use_elasticsearch and self.elasticsearch_gate is not None:
+                use_elasticsearch = self.elasticsearch_gate.is_available()
+                if not use_elasticsearch and self._fall_back_to_last_entry():
+                    return
+
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            try:
+                batches = self._batches_for_user(use_elasticsearch)
+            except BudgetExceeded as exc:
+                # batch files are parsed by the same call, Elasticsearch is to blame only if it doesn't answer
+                if not self.elasticsearch_gate.recheck() and self._has_elasticsearch_entry():
+                    logging.warning("DirectoryDiscovery: {0}".format(exc))
+                    self._fall_back_to_last_entry()
+                    return
+                # calling jeanpaulstart again would run along the call still running
+                batches = exc.wait()
+
+        except Exception as exc:
+            logging.exception("DirectoryDiscovery: can't list batches of {0}".format(self.directory))
+            self.signals.failed.emit(self.generation, self.directory, str(exc))
+            return
+
+        get_profiler().record('batches_for_user ' + self.directory, wall_start, cpu_start)
+        self._emit_found(fingerprint, list(batches), use_elasticsearch)
+
+    def _can_reuse_last_entry(self, fingerprint):
+        if not self.last_entry or fingerprint != self.last_entry['fingerprint']:
+            return False
+        if not self.elasticsearch_url:
+            return self.reuse_last_entry
+
+        # batches given by Elasticsearch change without any batch file changing, they expire
+        if not self.last_entry.get('elasticsearch'):
+            return False
+        age = time.time() - self.last_entry.get('resolved_at', 0)
+        return age < self.elasticsearch_ttl
+
+    def _fall_back_to_last_entry(self):
+        """ Emit the last batches resolved with Elasticsearch, if any.
+
+        Returns:
+            bool: False if there is none, batches have to be resolved without Elasticsearch
+        """
+        if not self._has_elasticsearch_entry():
+            self.signals.degraded.emit(
+                self.generation, self.directory, "Elasticsearch unreachable, batches resolved without it"
+            )
+            return False
+
+        self.signals.degraded.emit(
+            self.generation, self.directory, "Elasticsearch unreachable, showing last known batches"
+        )
+        self.signals.found.emit(self.generation, self.directory, dict(self.last_entry, batches=None))
+        return True
+
+    def _has_elasticsearch_entry(self):
+        return bool(self.last_entry and self.last_entry.get('elasticsearch'))
+
+    def _batches_for_user(self, use_elasticsearch):
+        if not use_elasticsearch or self.elasticsearch_gate is None or self.query_budget is None:
+            return self._call_batches_for_user(use_elasticsearch)
+        return call_with_budget(self._call_batches_for_user, self.query_budget, use_elasticsearch)
+
+    def _call_batches_for_user(self, use_elasticsearch):
+        return jeanpaulstart.batches_for_user(
+            batch_directories=[self.directory],
+            username=self.username,
+            tags_filepath=self.tags_filepath,
+            elasticsearch_url=self.elasticsearch_url if use_elasticsearch else None,
+            elasticsearch_index=self.elasticsearch_index if use_elasticsearch else None
+        )
+
+    def _emit_found(self, fingerprint, batches, resolved_with_elasticsearch):
+        resolved_at = time.time()
+        if batches is None:
+            resolved_at = self.last_entry.get('resolved_at', resolved_at)
+
+        self.signals.found.emit(self.generation, self.directory, {
+            'fingerprint': fingerprint,
+            'batches': batches,
+            'elasticsearch': resolved_with_elasticsearch,
+            'resolved_at': resolved_at
+        })
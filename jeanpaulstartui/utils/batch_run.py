@@ -0,0 +1,103 @@
+import time
+import logging
+
+from PySide6.QtCore import QObject, Signal
+
+import jeanpaulstart
+from jeanpaulstartui.utils.execution import error_as_status, iterate_steps
+
+
+CANCELLED_MESSAGE = "cancelled"
+
+
+class BatchRunSignals(QObject):
+    status = Signal(int, str)
+    progress = Signal(int, float, float)
+    finished = Signal(int, bool, str)
+
+
+class BatchRun(object):
+    """ Execute a batch with a jeanpaulstart Executor, outside of the GUI thread, `run` is given to the thread pool.
+
+    Status and progress are reported through `signals`, every signal carries the run id
+    so several runs can share the same receivers.
+    Cancellation is cooperative: it is checked between two executor steps.
+
+    An `executor` prepared beforehand for the batch and option can be given, otherwise it is built here.
+
+    The duration of each task is kept in `task_durations`. With a duration `estimate`,
+    progress is weighted by the expected duration of the tasks, and the remaining time is sent with it
+    (negative when unknown).
+    """
+    def __init__(self, run_id, batch, option_name=None, estimate=None, executor=None):
+        self.run_id = run_id
+        self.batch = batch
+        self.option_name = option_name
+        self.estimate = estimate
+        self.executor = executor
+        self.started_at = None
+        self.duration = None
+        self.task_durations = list()
+        self._task_start = None
+        self.signals = BatchRunSignals()
+        self._cancelled = False
+
+    @property
+    def is_cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        self.started_at = time.time()
+        start = time.perf_counter()
+        try:
+            executor = self.executor or jeanpaulstart.Executor(self.batch, self.option_name)
+            for task_index, (task_name, progress) in enumerate(iterate_steps(executor)):
+                self._task_started(task_name)
+                if self._cancelled:
+                    self._stop_timing(start, last_task_ran=False)
+                    self.signals.finished.emit(self.run_id, False, CANCELLED_MESSAGE)
+                    return
+                self.signals.status.emit(self.run_id, task_name)
+                self._emit_progress(task_index, task_name, progress)
+
+        except Exception as exc:
+            logging.exception("BatchRun: {0} failed".format(self.batch.name))
+            self._stop_timing(start)
+            self.signals.finished.emit(self.run_id, False, str(exc))
+            return
+
+        self._stop_timing(start)
+
+        if executor.success:
+            self.signals.finished.emit(self.run_id, True, '')
+        else:
+            self.signals.finished.emit(self.run_id, False, error_as_status(executor))
+
+    def _task_started(self, task_name):
+        now = time.perf_counter()
+        self._task_finished(now)
+        self.task_durations.append([task_name, 0.0])
+        self._task_start = now
+
+    def _task_finished(self, now):
+        if self._task_start is not None:
+            self.task_durations[-1][1] = now - self._task_start
+            self._task_start = None
+
+    def _stop_timing(self, start, last_task_ran=True):
+        now = time.perf_counter()
+        if not last_task_ran and self._task_start is not None:
+            self.task_durations.pop()
+            self._task_start = None
+        self._task_finished(now)
+        self.duration = now - start
+
+    def _emit_progress(self, task_index, task_name, progress):
+        estimate = self.estimate.estimate(task_index, task_name) if self.estimate is not None else None
+        if estimate is None:
+            self.signals.progress.emit(self.run_id, progress, -1.0)
+        else:
+            self.signals.progress.emit(self.run_id, estimate[0], estimate[1])
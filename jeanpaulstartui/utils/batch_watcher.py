@@ -0,0 +1,220 @@
+import os
+import logging
+
+from PySide6.QtCore import QObject, QThreadPool, QTimer, QFileSystemWatcher, Signal
+
+from jeanpaulstartui.utils.batch_catalog_cache import directory_fingerprint
+
+
+DEBOUNCE_DELAY = 1000
+DEFAULT_POLL_INTERVAL = 30
+
+
+class _PollSignals(QObject):
+    polled = Signal(object, object)
+
+
+class _WalkSignals(QObject):
+    walked = Signal(str, object)
+
+
+class _Poll(object):
+    """ Get the fingerprint of batch directories and the mtime of the tags file, outside of the GUI thread.
+    """
+    def __init__(self, directories, tags_filepath):
+        self.directories = directories
+        self.tags_filepath = tags_filepath
+        self.signals = _PollSignals()
+
+    def run(self):
+        fingerprints = dict()
+        for directory in self.directories:
+            try:
+                fingerprints[directory] = directory_fingerprint(directory)
+            except Exception as exc:
+                logging.warning("BatchWatcher: can't poll {0}: {1}".format(directory, exc))
+        tags_mtime = None
+        if self.tags_filepath:
+            try:
+                tags_mtime = os.path.getmtime(self.tags_filepath)
+            except OSError:
+                pass
+        self.signals.polled.emit(fingerprints, tags_mtime)
+
+
+class _Walk(object):
+    """ List the paths to watch in a batch directory: the directory, its sub directories and their files,
+    outside of the GUI thread.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        self.signals = _WalkSignals()
+
+    def run(self):
+        paths = list()
+        try:
+            for root, _, filenames in os.walk(self.directory):
+                paths.append(root)
+                paths.extend(os.path.join(root, filename) for filename in filenames)
+        except Exception as exc:
+            logging.warning("BatchWatcher: can't walk {0}: {1}".format(self.directory, exc))
+        self.signals.walked.emit(self.directory, paths)
+
+
+class BatchWatcher(QObject):
+    """ Watch batch directories and the tags file, and tell which ones changed.
+
+    Changes are watched with a QFileSystemWatcher, the paths to watch are listed in the background.
+    Directories that can't be watched, or every directory if a poll interval is given (network mounts),
+    are polled instead.
+    Bursts of changes are debounced: directories_changed is emitted once things calm down.
+    """
+    directories_changed = Signal(list)
+    tags_changed = Signal()
+
+    def __init__(self, batch_directories, tags_filepath=None, poll_interval=None,
+                 debounce_delay=DEBOUNCE_DELAY, parent=None):
+        QObject.__init__(self, parent)
+        self.batch_directories = list(batch_directories)
+        self.tags_filepath = tags_filepath
+        self._changed_directories = set()
+        self._tags_changed = False
+        self._polled_directories = list()
+        self._fingerprints = None
+        self._tags_mtime = None
+        self._poll = None
+        self._walks = dict()
+        self._walk_again = set()
+        self._started = False
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_delay)
+        self._debounce_timer.timeout.connect(self._emit_changes)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(int((poll_interval or DEFAULT_POLL_INTERVAL) * 1000))
+        self._poll_timer.timeout.connect(self._start_poll)
+        self._thread_pool = QThreadPool()
+
+        self._file_system_watcher = QFileSystemWatcher(self)
+        self._file_system_watcher.directoryChanged.connect(self._path_changed)
+        self._file_system_watcher.fileChanged.connect(self._path_changed)
+
+        if poll_interval:
+            self._polled_directories = list(self.batch_directories)
+        else:
+            for directory in self.batch_directories:
+                self._start_walk(directory)
+
+        if self.tags_filepath and (poll_interval or not self._file_system_watcher.addPath(self.tags_filepath)):
+            self._tags_mtime = _mtime(self.tags_filepath)
+
+    def start(self):
+        self._started = True
+        self._start_polling()
+
+    def stop(self):
+        self._started = False
+        self._poll_timer.stop()
+        self._debounce_timer.stop()
+
+    def _start_polling(self):
+        if self._poll_timer.isActive():
+            return
+        if self._polled_directories or self._tags_mtime is not None:
+            self._start_poll()
+            self._poll_timer.start()
+
+    def _start_walk(self, directory):
+        if directory in self._walks:
+            # the running walk may miss the change, walk again once it is done
+            self._walk_again.add(directory)
+            return
+        walk = _Walk(directory)
+        walk.signals.walked.connect(self._walked)
+        self._walks[directory] = walk
+        self._thread_pool.start(walk.run)
+
+    def _walked(self, directory, paths):
+        """ Watch the paths found in the directory, or poll the directory if they can't be watched.
+        """
+        self._walks.pop(directory, None)
+        if directory in self._walk_again:
+            self._walk_again.discard(directory)
+            self._start_walk(directory)
+
+        if directory in self._polled_directories:
+            return
+        watched_paths = set(self._file_system_watcher.files() + self._file_system_watcher.directories())
+        paths = [path for path in paths if path not in watched_paths]
+        if paths and self._file_system_watcher.addPaths(paths):
+            logging.info("BatchWatcher: polling {0}, it can't be watched".format(directory))
+            self._polled_directories.append(directory)
+            if self._started:
+                self._start_polling()
+
+    def _path_changed(self, path):
+        path = os.path.normpath(path)
+        if self.tags_filepath and path == os.path.normpath(self.tags_filepath):
+            self._tags_changed = True
+            # editors often replace the file, which removes it from the watcher
+            if os.path.isfile(self.tags_filepath):
+                self._file_system_watcher.addPath(self.tags_filepath)
+            self._debounce_timer.start()
+            return
+
+        for directory in self.batch_directories:
+            normalized_directory = os.path.normpath(directory)
+            if path == normalized_directory or path.startswith(normalized_directory + os.sep):
+                self._changed_directories.add(directory)
+                if directory not in self._polled_directories:
+                    self._start_walk(directory)
+        self._debounce_timer.start()
+
+    def _start_poll(self):
+        if self._poll is not None:
+            return
+        self._poll = _Poll(list(self._polled_directories), self.tags_filepath if self._tags_mtime is not None else None)
+        self._poll.signals.polled.connect(self._polled)
+        self._thread_pool.start(self._poll.run)
+
+    def _polled(self, fingerprints, tags_mtime):
+        self._poll = None
+        if self._fingerprints is None:
+            # first poll, only takes the reference
+            self._fingerprints = fingerprints
+            self._tags_mtime = tags_mtime or self._tags_mtime
+            return
+
+        for directory, fingerprint in fingerprints.items():
+            # a directory polled since the last poll only gets its reference
+            if directory in self._fingerprints and self._fingerprints[directory] != fingerprint:
+                self._changed_directories.add(directory)
+        self._fingerprints.update(fingerprints)
+
+        if tags_mtime is not None and tags_mtime != self._tags_mtime:
+            self._tags_mtime = tags_mtime
+            self._tags_changed = True
+
+        if self._changed_directories or self._tags_changed:
+            self._debounce_timer.start()
+
+    def _emit_changes(self):
+        if self._tags_changed:
+            self._tags_changed = False
+            self._changed_directories.clear()
+            self.tags_changed.emit()
+            return
+
+        if self._changed_directories:
+            directories = [directory for directory in self.batch_directories if directory in self._changed_directories]
+            self._changed_directories.clear()
+            self.directories_changed.emit(directories)
+
+
+def _mtime(filepath):
+    try:
+        return os.path.getmtime(filepath)
+    except OSError:
+        return None
@@ -0,0 +1,134 @@
+import time
+import logging
+import threading
+import http.client
+import urllib.parse
+
+
+DEFAULT_BUDGET = 3.0
+DEFAULT_TTL = 60.0
+RETRY_DELAY = 30.0
+
+
+class BudgetExceeded(Exception):
+    """ Raised by call_with_budget, `wait()` waits for the call still running and gives its result.
+    """
+    def __init__(self, message, wait=None):
+        Exception.__init__(self, message)
+        self.wait = wait
+
+
+def call_with_budget(function, budget, *args, **kwargs):
+    """ Call a function, without waiting more than budget seconds for it.
+
+    The function runs in a daemon thread: if the budget is exceeded, it is left running,
+    its result is dropped unless the raised exception's `wait()` is called.
+
+    Raises:
+        BudgetExceeded: If the function didn't return in time
+    """
+    result = dict()
+
+    def target():
+        try:
+            result['value'] = function(*args, **kwargs)
+        except BaseException as exc:
+            result['error'] = exc
+
+    def wait():
+        thread.join()
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+
+    thread = threading.Thread(target=target, name='jps-budget-call', daemon=True)
+    thread.start()
+    thread.join(budget)
+    if thread.is_alive():
+        raise BudgetExceeded(
+            "{0} took more than {1}s".format(getattr(function, '__name__', function), budget),
+            wait
+        )
+    return wait()
+
+
+class ElasticsearchGate(object):
+    """ Tell if the Elasticsearch server answers within a latency budget.
+
+    The answer is cached: for `ttl` seconds when the server answered, for `retry_delay` seconds
+    when it didn't, so a server that is down doesn't stall every reload.
+    The HTTP connection used to check the server is kept open across checks, it is opened again
+    once if the server closed it meanwhile.
+    Safe to use from several threads.
+    """
+    def __init__(self, url, budget=DEFAULT_BUDGET, ttl=DEFAULT_TTL, retry_delay=RETRY_DELAY):
+        self.url = url
+        self.budget = budget
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+        self._split_url = urllib.parse.urlsplit(url)
+        self._connection = None
+        self._available = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def is_available(self):
+        with self._lock:
+            if self._checked_at is not None:
+                delay = self.ttl if self._available else self.retry_delay
+                if time.monotonic() - self._checked_at < delay:
+                    return self._available
+            return self._check_now()
+
+    def recheck(self):
+        """ Check the server now, whatever the cached answer, when a request made by someone else is slow.
+        """
+        with self._lock:
+            return self._check_now()
+
+    def _check_now(self):
+        self._available = self._check()
+        self._checked_at = time.monotonic()
+        return self._available
+
+    def _check(self):
+        reused_connection = self._connection is not None
+        try:
+            try:
+                status = self._head()
+            except (ConnectionResetError, BrokenPipeError):
+                # servers close idle kept-alive connections, only a fresh connection tells the server is down
+                if not reused_connection:
+                    raise
+                self._close()
+                status = self._head()
+        except (OSError, http.client.HTTPException) as exc:
+            logging.warning("ElasticsearchGate: {0} didn't answer within {1}s: {2}".format(self.url, self.budget, exc))
+            self._close()
+            return False
+
+        # any HTTP answer means the server is up, authentication is jeanpaulstart's business
+        return status < 500
+
+    def _head(self):
+        connection = self._get_connection()
+        connection.request('HEAD', self._split_url.path or '/')
+        response = connection.getresponse()
+        response.read()
+        return response.status
+
+    def _get_connection(self):
+        if self._connection is None:
+            connection_class = http.client.HTTPSConnection if self._split_url.scheme == 'https' \
+                else http.client.HTTPConnection
+            self._connection = connection_class(
+                self._split_url.hostname,
+                self._split_url.port,
+                timeout=self.budget
+            )
+        return self._connection
+
+    def _close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,15 @@
+
+
+def error_as_status(executor):
+    return executor.messages[-1].replace('][', ' : ')
+
+
+def iterate_steps(executor):
+    """ Step the executor until it stops.
+
+    Yields:
+        tuple: (name of the next task, progress) before each step
+    """
+    while not executor.has_stopped:
+        yield executor.next_task.name, executor.progress
+        executor.step()
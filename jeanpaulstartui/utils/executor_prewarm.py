@@ -0,0 +1,78 @@
+import time
+import logging
+import threading
+
+from PySide6.QtCore import QThreadPool
+
+import jeanpaulstart
+
+
+PREWARM_TTL = 10.0
+
+
+class _PreparedExecutor(object):
+    def __init__(self, batch):
+        self.batch = batch
+        self.prepared_at = time.monotonic()
+        self.executor = None
+
+
+class ExecutorPrewarm(object):
+    """ Executors built ahead of a launch, while the pointer rests on a batch.
+
+    Building an Executor parses the tasks of the batch and expands their variables, nothing is run.
+    It is done in a background thread; the prepared executor is used once, by the next launch
+    of the same batch and option, if it happens within `ttl` seconds.
+    """
+    def __init__(self, ttl=PREWARM_TTL):
+        self.ttl = ttl
+        self._entries = dict()
+        self._lock = threading.Lock()
+        # a single thread: the pointer rests on one batch at a time
+        self._thread_pool = QThreadPool()
+        self._thread_pool.setMaxThreadCount(1)
+
+    def prepare(self, batch, option_name):
+        """ Build the executor of a batch in the background, unless it is already prepared.
+        """
+        key = (batch.name, option_name)
+        with self._lock:
+            self._drop_expired()
+            entry = self._entries.get(key)
+            if entry is not None and entry.batch is batch:
+                return
+            entry = _PreparedExecutor(batch)
+            self._entries[key] = entry
+        self._thread_pool.start(lambda: self._build(key, entry, option_name))
+
+    def take(self, batch, option_name):
+        """ Get the executor prepared for a batch and forget it.
+
+        Returns:
+            jeanpaulstart.Executor: None if it isn't prepared yet, or expired, or the batch was reloaded
+        """
+        with self._lock:
+            entry = self._entries.pop((batch.name, option_name), None)
+        if entry is None or entry.executor is None or entry.batch is not batch or self._is_expired(entry):
+            return None
+        return entry.executor
+
+    def _build(self, key, entry, option_name):
+        try:
+            executor = jeanpaulstart.Executor(entry.batch, option_name)
+        except Exception as exc:
+            # the launch builds it again, and reports the error
+            logging.debug("JPS UI: Can't prepare {0}.  exc: {1}".format(entry.batch.name, exc))
+            return
+
+        with self._lock:
+            if self._entries.get(key) is entry:
+                entry.executor = executor
+                entry.prepared_at = time.monotonic()
+
+    def _drop_expired(self):
+        for key in [key for key, entry in self._entries.items() if self._is_expired(entry)]:
+            del self._entries[key]
+
+    def _is_expired(self, entry):
+        return time.monotonic() - entry.prepared_at > self.ttl
@@ -0,0 +1,227 @@
+import os
+import shutil
+import hashlib
+import logging
+import collections
+
+from PySide6.QtGui import *
+from PySide6.QtCore import *
+
+
+THUMBNAIL_CACHE_DIRECTORY = "thumbnails"
+THUMBNAIL_CACHE_VERSION = 2
+THUMBNAIL_CACHE_SIZE = 10000
+THUMBNAIL_MTIME_TEXT = "jps_source_mtime"
+MEMORY_CACHE_SIZE = 1024
+
+
+def scaled_size(size, target_size):
+    """ Get the size an image is scaled to, so it covers a square of target_size.
+    Same as QImage.scaled with Qt.KeepAspectRatioByExpanding.
+    """
+    if size.isEmpty():
+        return QSize(target_size, target_size)
+    return size.scaled(target_size, target_size, Qt.KeepAspectRatioByExpanding)
+
+
+class IconLoaderSignals(QObject):
+    loaded = Signal(object, object, QImage)
+
+
+class IconLoader(object):
+    """ Read an icon downscaled to the target size, outside of the GUI thread.
+
+    `loaded` is emitted with the key, the modification time of the icon and the image.
+    If the icon didn't change since `known_mtime`, the image is null. If it can't be read,
+    the modification time is None.
+
+    The image is read from the thumbnail cache if the thumbnail was made from the same modification time,
+    otherwise the original image is decoded at the target size with QImageReader and stored in the thumbnail cache.
+    `run` is given to the thread pool, so the loader isn't kept once it is done.
+    """
+    def __init__(self, key, known_mtime=None):
+        self.key = key
+        self.known_mtime = known_mtime
+        self.signals = IconLoaderSignals()
+
+    def run(self):
+        image_path, target_size = self.key
+        try:
+            mtime = os.path.getmtime(image_path)
+        except OSError:
+            logging.warning("Impossible to find " + image_path)
+            self.signals.loaded.emit(self.key, None, QImage())
+            return
+
+        if mtime == self.known_mtime:
+            self.signals.loaded.emit(self.key, mtime, QImage())
+            return
+
+        thumbnail_filepath = _get_thumbnail_filepath(self.key)
+        if os.path.isfile(thumbnail_filepath):
+            thumbnail_reader = QImageReader(thumbnail_filepath)
+            if thumbnail_reader.text(THUMBNAIL_MTIME_TEXT) == repr(mtime):
+                image = thumbnail_reader.read()
+                if not image.isNull():
+                    self.signals.loaded.emit(self.key, mtime, image)
+                    return
+
+        reader = QImageReader(image_path)
+        reader.setScaledSize(scaled_size(reader.size(), target_size))
+        image = reader.read()
+        if image.isNull():
+            logging.warning("Impossible to read {0}: {1}".format(image_path, reader.errorString()))
+            self.signals.loaded.emit(self.key, None, image)
+            return
+
+        # the thumbnail of the previous version of the icon is replaced
+        image.setText(THUMBNAIL_MTIME_TEXT, repr(mtime))
+        try:
+            os.makedirs(os.path.dirname(thumbnail_filepath), exist_ok=True)
+            image.save(thumbnail_filepath, 'PNG')
+        except OSError:
+            logging.error("JPS UI: Can't write thumbnail of {0}".format(image_path))
+
+        self.signals.loaded.emit(self.key, mtime, image)
+
+
+class IconCache(QObject):
+    """ Give downscaled icons as QPixmap.
+
+    Pixmaps are kept in a LRU memory cache, keyed by image path and size, with the modification time
+    of the image they were loaded from.
+    Missing pixmaps are loaded in a thread pool, the callback is called once loaded.
+    Pixmaps in memory are given right away, and checked in the thread pool: if the image changed since,
+    the callback is called again with the new pixmap. No file is read on the GUI thread.
+    The thumbnails of older cache versions are deleted, and the oldest thumbnails once there are
+    more than THUMBNAIL_CACHE_SIZE.
+    """
+    def __init__(self, parent=None, max_size=MEMORY_CACHE_SIZE):
+        QObject.__init__(self, parent)
+        self.max_size = max_size
+        self._pixmaps = collections.OrderedDict()
+        self._callbacks = dict()
+        self._refresh_callbacks = dict()
+        self._loaders = dict()
+        self._placeholders = dict()
+        self._thread_pool = QThreadPool()
+        self._thread_pool.start(prune_thumbnails, -1)
+
+    def request(self, image_path, target_size, callback, priority=0, changed_only=False):
+        """ Call callback with the pixmap of the image, downscaled to target_size.
+
+        The callback is called right away if the pixmap is in memory, and again if the image changed
+        since, or once loaded.
+
+        Args:
+            image_path (str): Path of the image
+            target_size (int): Size of the square the image has to cover
+            callback (callable): Called with the QPixmap
+            priority (int): Loading priority, higher first
+            changed_only (bool): If True, a pixmap in memory isn't given, only its replacement if the image changed
+        """
+        key = (image_path, int(target_size))
+        entry = self._pixmaps.get(key)
+        if entry is None:
+            self._callbacks.setdefault(key, list()).append(callback)
+        else:
+            self._pixmaps.move_to_end(key)
+            if not changed_only:
+                callback(entry[1])
+            self._refresh_callbacks.setdefault(key, list()).append(callback)
+        self._start_loader(key, priority)
+
+    def clear(self):
+        self._pixmaps.clear()
+
+    def _start_loader(self, key, priority=0):
+        if key in self._loaders:
+            return
+        entry = self._pixmaps.get(key)
+        loader = IconLoader(key, entry[0] if entry is not None else None)
+        loader.signals.loaded.connect(self._loaded)
+        self._loaders[key] = loader
+        self._thread_pool.start(loader.run, priority)
+
+    def _loaded(self, key, mtime, image):
+        self._loaders.pop(key, None)
+        entry = self._pixmaps.get(key)
+        if mtime is not None and image.isNull():
+            # unchanged since the pixmap in memory was loaded
+            self._refresh_callbacks.pop(key, None)
+            if entry is not None:
+                self._call_back(key, entry[1])
+            elif key in self._callbacks:
+                # the pixmap was dropped from memory meanwhile
+                self._start_loader(key)
+            return
+
+        if mtime is None:
+            pixmap = self._placeholder(key[1])
+        else:
+            pixmap = QPixmap.fromImage(image)
+            self._pixmaps[key] = (mtime, pixmap)
+            self._pixmaps.move_to_end(key)
+            while len(self._pixmaps) > self.max_size:
+                self._pixmaps.popitem(last=False)
+        self._call_back(key, pixmap, self._refresh_callbacks.pop(key, list()))
+
+    def _call_back(self, key, pixmap, refresh_callbacks=()):
+        for callback in self._callbacks.pop(key, list()) + list(refresh_callbacks):
+            try:
+                callback(pixmap)
+            except RuntimeError:
+                # the widget waiting for this icon has been deleted meanwhile
+                pass
+
+    def _placeholder(self, target_size):
+        if target_size not in self._placeholders:
+            image = QImage(2, 2, QImage.Format_RGB16)
+            image.fill(Qt.black)
+            self._placeholders[target_size] = QPixmap.fromImage(image.scaled(target_size, target_size))
+        return self._placeholders[target_size]
+
+
+def prune_thumbnails(max_count=THUMBNAIL_CACHE_SIZE):
+    """ Delete the thumbnails of older cache versions, and the oldest ones above max_count.
+    """
+    thumbnail_directory = _get_thumbnail_directory()
+    version_directory = os.path.join(thumbnail_directory, str(THUMBNAIL_CACHE_VERSION))
+    try:
+        for entry in os.scandir(thumbnail_directory):
+            if entry.name == str(THUMBNAIL_CACHE_VERSION):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.remove(entry.path)
+
+        thumbnails = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(version_directory)]
+        if len(thumbnails) <= max_count:
+            return
+        thumbnails.sort()
+        for _, thumbnail_filepath in thumbnails[:len(thumbnails) - max_count]:
+            os.remove(thumbnail_filepath)
+    except FileNotFoundError:
+        return
+    except OSError as exc:
+        logging.warning("JPS UI: Can't prune thumbnails: {0}".format(exc))
+
+
+def _get_thumbnail_directory():
+    return os.path.join(
+        os.path.expanduser('~/.jeanpaulstart'),
+        THUMBNAIL_CACHE_DIRECTORY
+    ).replace('\\', '/')
+
+
+def _get_thumbnail_filepath(key):
+    """ The thumbnail of an icon at a size, whatever its modification time: an edited icon replaces it.
+    """
+    image_path, target_size = key
+    digest = hashlib.sha1('{0}|{1}'.format(image_path, target_size).encode('utf-8')).hexdigest()
+    return os.path.join(
+        _get_thumbnail_directory(),
+        str(THUMBNAIL_CACHE_VERSION),
+        digest + '.png'
+    ).replace('\\', '/')
@@ -0,0 +1,246 @@
+import os
+import json
+import atexit
+import logging
+import statistics
+import threading
+import collections
+
+
+LAUNCH_TELEMETRY_FILE = "jps_launch_telemetry.jsonl"
+FLUSH_SIZE = 10
+HISTORY_SIZE = 20
+MAX_RECORDS = 5000
+
+
+def percentile(values, rank):
+    """ Get the percentile of values, interpolated between the closest ranks.
+
+    Args:
+        values (list): Numbers, not empty
+        rank (float): Percentile, between 0 and 100
+
+    Returns:
+        float: The percentile
+    """
+    values = sorted(values)
+    position = (len(values) - 1) * rank / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def load_records(filepath=None):
+    """ Read the launches recorded in the telemetry file.
+
+    Yields:
+        dict: {'batch', 'option', 'username', 'started_at', 'duration', 'success', 'cancelled',
+            'tasks': [[task name, duration], ...]}
+    """
+    filepath = filepath or _get_launch_telemetry_filepath()
+    try:
+        with open(filepath, 'r') as telemetry_file:
+            for line in telemetry_file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # last line of a launcher that crashed while writing it
+                    continue
+    except FileNotFoundError:
+        return
+    except OSError as exc:
+        logging.error("JPS UI: Can't read launch telemetry file.  exc: {}".format(exc))
+
+
+def summarize(records):
+    """ Get p50, p95 and max durations per batch and per task of each batch.
+    Only successful launches are summarized, failed and cancelled ones are only counted.
+
+    Returns:
+        dict: {'batches': {batch: stats}, 'tasks': {batch: {task: stats}}}
+            stats being {'count', 'failures', 'p50', 'p95', 'max'}
+    """
+    batch_durations = collections.defaultdict(list)
+    batch_failures = collections.Counter()
+    task_durations = collections.defaultdict(lambda: collections.defaultdict(list))
+
+    for record in records:
+        if not record.get('success'):
+            batch_failures[record['batch']] += 1
+            continue
+        batch_durations[record['batch']].append(record['duration'])
+        for task_name, duration in record.get('tasks', list()):
+            task_durations[record['batch']][task_name].append(duration)
+
+    return {
+        'batches': {
+            batch: _stats(batch_durations.get(batch, list()), batch_failures[batch])
+            for batch in set(batch_durations) | set(batch_failures)
+        },
+        'tasks': {
+            batch: {task_name: _stats(durations) for task_name, durations in tasks.items()}
+            for batch, tasks in task_durations.items()
+        }
+    }
+
+
+def _stats(durations, failures=0):
+    stats = {'count': len(durations), 'failures': failures, 'p50': None, 'p95': None, 'max': None}
+    if durations:
+        stats.update(p50=percentile(durations, 50), p95=percentile(durations, 95), max=max(durations))
+    return stats
+
+
+class TaskDurationEstimate(object):
+    """ Expected duration of each task of a batch, to weight the progress of a launch by time.
+
+    If the tasks of a launch don't match the expected ones, no estimate can be given.
+    """
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self._elapsed = [0.0]
+        for _, duration in tasks:
+            self._elapsed.append(self._elapsed[-1] + duration)
+
+    @property
+    def total(self):
+        return self._elapsed[-1]
+
+    def estimate(self, task_index, task_name):
+        """ Get the progress and the remaining time when a task starts.
+
+        Args:
+            task_index (int): Index of the task in the launch
+            task_name (str): Name of the task
+
+        Returns:
+            tuple: (progress between 0 and 1, remaining seconds) or None
+        """
+        if self.total <= 0 or task_index >= len(self.tasks) or self.tasks[task_index][0] != task_name:
+            return None
+        return self._elapsed[task_index] / self.total, self.total - self._elapsed[task_index]
+
+
+class LaunchTelemetry(object):
+    """ Record the duration of launches and of their tasks, in a JSON lines file.
+
+    Records are buffered and written `flush_size` at a time, and when the process exits.
+    The last successful launches of each batch are kept in memory to estimate the next ones,
+    once `load()` read them in a background thread.
+    The file is compacted while it is loaded: only the last `max_records` launches are kept.
+    """
+    def __init__(self, filepath=None, flush_size=FLUSH_SIZE, history_size=HISTORY_SIZE, max_records=MAX_RECORDS):
+        self.filepath = filepath or _get_launch_telemetry_filepath()
+        self.flush_size = flush_size
+        self.history_size = history_size
+        self.max_records = max_records
+        self._buffer = list()
+        self._history = None
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    @property
+    def is_loaded(self):
+        return self._history is not None
+
+    def load(self):
+        """ Read the last launches in a daemon thread, estimates are given once they are read.
+
+        Returns:
+            threading.Thread: The thread reading them
+        """
+        thread = threading.Thread(target=self._load, name='jps-telemetry-load', daemon=True)
+        thread.start()
+        return thread
+
+    def record(self, record):
+        """ Record a launch.
+
+        Args:
+            record (dict): Launch, as yielded by load_records()
+        """
+        with self._lock:
+            self._remember(record)
+            self._buffer.append(record)
+            if len(self._buffer) < self.flush_size:
+                return
+        self.flush()
+
+    def flush(self):
+        with self._file_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, list()
+            if not records:
+                return
+
+            try:
+                os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+                with open(self.filepath, 'a') as telemetry_file:
+                    telemetry_file.write(''.join(json.dumps(record) + '\n' for record in records))
+            except OSError:
+                logging.error("JPS UI: Can't write launch telemetry file.")
+
+    def estimate(self, batch_name, option_name):
+        """ Estimate the task durations of a launch from the last successful ones.
+        Tasks are those of the last launch, durations are the median of each task.
+
+        Returns:
+            TaskDurationEstimate: None if the batch was never launched successfully, or the launches aren't loaded
+        """
+        with self._lock:
+            if self._history is None:
+                return None
+            launches = list(self._history.get((batch_name, option_name), list()))
+        if not launches:
+            return None
+
+        durations = collections.defaultdict(list)
+        for tasks in launches:
+            for task_name, duration in tasks:
+                durations[task_name].append(duration)
+        return TaskDurationEstimate([
+            (task_name, statistics.median(durations[task_name]))
+            for task_name, _ in launches[-1]
+        ])
+
+    def _load(self):
+        # a flush waits for the file to be read and compacted, the records it writes can't be lost
+        with self._file_lock:
+            records = collections.deque(maxlen=self.max_records)
+            record_count = 0
+            for record in load_records(self.filepath):
+                records.append(record)
+                record_count += 1
+            if record_count > self.max_records:
+                self._compact(records)
+
+            with self._lock:
+                records.extend(self._buffer)
+                self._history = dict()
+                for record in records:
+                    self._remember(record)
+
+    def _compact(self, records):
+        temporary_filepath = self.filepath + '.tmp'
+        try:
+            with open(temporary_filepath, 'w') as telemetry_file:
+                telemetry_file.write(''.join(json.dumps(record) + '\n' for record in records))
+            os.replace(temporary_filepath, self.filepath)
+        except OSError:
+            logging.error("JPS UI: Can't compact launch telemetry file.")
+
+    def _remember(self, record):
+        if self._history is None or not record.get('success'):
+            return
+        key = (record['batch'], record.get('option'))
+        if key not in self._history:
+            self._history[key] = collections.deque(maxlen=self.history_size)
+        self._history[key].append(record.get('tasks', list()))
+
+
+def _get_launch_telemetry_filepath():
+    return os.path.join(
+        os.path.expanduser('~/.jeanpaulstart'),
+        LAUNCH_TELEMETRY_FILE
+    ).replace('\\', '/')
@@ -0,0 +1,50 @@
+import os
+
+import jeanpaulstart
+from jeanpaulstartui.utils.elasticsearch_gate import DEFAULT_BUDGET, ElasticsearchGate
+from jeanpaulstartui.utils.startup_profiler import get_profiler
+
+
+def _mtime(filepath):
+    try:
+        return os.path.getmtime(filepath)
+    except OSError:
+        return None
+
+
+class LauncherSession(object):
+    """ What the launcher keeps across reloads, so that a reload only pays for what changed.
+
+    Plugins are loaded once.
+    The tags file is only looked at again when its modification time changes.
+    The Elasticsearch gate is kept, with its connection and its last answer.
+    """
+    def __init__(self):
+        self._plugins_loaded = False
+        self._tags_state = None
+        self._elasticsearch_gate = None
+
+    def load_plugins(self):
+        if self._plugins_loaded:
+            return
+        with get_profiler().phase('load_plugins'):
+            jeanpaulstart.load_plugins()
+        self._plugins_loaded = True
+
+    def tags_changed(self, tags_filepath):
+        """ Tell if the tags file changed since the last call, always True on the first one.
+        """
+        tags_state = (tags_filepath, _mtime(tags_filepath) if tags_filepath else None)
+        changed = tags_state != self._tags_state
+        self._tags_state = tags_state
+        return changed
+
+    def elasticsearch_gate(self, url, budget=DEFAULT_BUDGET):
+        """ Get the gate checking Elasticsearch answers in time, None without Elasticsearch.
+        """
+        if not url:
+            return None
+        gate = self._elasticsearch_gate
+        if gate is None or gate.url != url or gate.budget != budget:
+            self._elasticsearch_gate = ElasticsearchGate(url, budget=budget)
+        return self._elasticsearch_gate
@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+import queue
+import atexit
+import logging
+import tempfile
+import threading
+import logging.handlers
+
+from PySide6.QtCore import QtMsgType, qInstallMessageHandler
+
+
+LOG_FILENAME = 'jeanpaulstart.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+DEDUPLICATION_INTERVAL = 60.0
+DEDUPLICATION_MAX_MESSAGES = 1000
+
+_QT_MESSAGE_LEVELS = {
+    QtMsgType.QtDebugMsg: logging.DEBUG,
+    QtMsgType.QtInfoMsg: logging.INFO,
+    QtMsgType.QtWarningMsg: logging.WARNING,
+    QtMsgType.QtCriticalMsg: logging.ERROR,
+    QtMsgType.QtFatalMsg: logging.CRITICAL
+}
+
+
+_listener = None
+_queue_handler = None
+
+
+class DeduplicationFilter(logging.Filter):
+    """ Let a repeated warning or error through once per `interval` seconds.
+    The number of dropped repetitions is appended to the next one let through.
+    """
+    def __init__(self, interval=DEDUPLICATION_INTERVAL, max_messages=DEDUPLICATION_MAX_MESSAGES):
+        logging.Filter.__init__(self)
+        self.interval = interval
+        self.max_messages = max_messages
+        self._messages = dict()
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            last_time, dropped = self._messages.get(key, (None, 0))
+            if last_time is not None and now - last_time < self.interval:
+                self._messages[key] = (last_time, dropped + 1)
+                return False
+            if len(self._messages) >= self.max_messages:
+                self._drop_old_messages(now)
+            self._messages[key] = (now, 0)
+
+        if dropped:
+            record.msg = '{0} ({1} repetitions dropped)'.format(record.getMessage(), dropped)
+            record.args = None
+        return True
+
+    def _drop_old_messages(self, now):
+        for key in [key for key, (last_time, _) in self._messages.items() if now - last_time >= self.interval]:
+            del self._messages[key]
+        if len(self._messages) >= self.max_messages:
+            self._messages.clear()
+
+
+def get_log_filepath():
+    return os.path.join(tempfile.gettempdir(), LOG_FILENAME)
+
+
+def start_logging(level=logging.WARNING, console_level=logging.NOTSET):
+    """ Route the records of the root logger through a queue, to handlers run by a background thread:
+    logging doesn't block the GUI thread on slow log files or consoles.
+    Repeated warnings and errors are rate limited by a DeduplicationFilter.
+    Handlers already on the root logger, as the one logging adds when a record is logged
+    before any handler, are replaced.
+
+    Args:
+        level (int or str): Level of the root logger
+        console_level (int or str): Level of the records written to stderr
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_handler.addFilter(DeduplicationFilter())
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+    root_logger.setLevel(level)
+    root_logger.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """ Write the queued records and go back to synchronous logging.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
+
+
+def add_log_handler(handler):
+    """ Add a handler to the root logger, run by the background thread if logging was started.
+    """
+    if _listener is None:
+        logging.getLogger().addHandler(handler)
+        return
+    _listener.stop()
+    _listener.handlers = _listener.handlers + (handler,)
+    _listener.start()
+
+
+def save_logs(log_filepath=None):
+    """ Write the logs of the process, Qt messages and uncaught exceptions included,
+    to a size rotated log file.
+
+    Args:
+        log_filepath (str): Log file, in the temporary directory by default
+
+    Returns:
+        logging.Handler: The file handler added to the root logger, see add_log_handler
+    """
+    log_filepath = log_filepath or get_log_filepath()
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_filepath,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    add_log_handler(file_handler)
+
+    qInstallMessageHandler(_qt_message_handler)
+    sys.excepthook = _log_uncaught_exception
+    return file_handler
+
+
+def _qt_message_handler(message_type, context, message):
+    logging.getLogger('Qt').log(_QT_MESSAGE_LEVELS.get(message_type, logging.INFO), message)
+
+
+def _log_uncaught_exception(exception_type, exception, traceback):
+    logging.critical("Uncaught exception", exc_info=(exception_type, exception, traceback))
+    sys.__excepthook__(exception_type, exception, traceback)
@@ -0,0 +1,135 @@
+import json
+import getpass
+import logging
+import argparse
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+
+CONNECTION_TIMEOUT = 300
+COMMANDS = ('show', 'reload', 'launch')
+
+
+def get_server_name(username):
+    return 'jeanpaulstart-{0}'.format(username)
+
+
+def send_command(username, command, arguments=(), timeout=CONNECTION_TIMEOUT):
+    """ Send a command to the launcher already running for the user.
+
+    Args:
+        username (str): User the launcher runs for
+        command (str): One of COMMANDS
+        arguments (list): Arguments of the command
+        timeout (int): Milliseconds to wait for each step
+
+    Returns:
+        bool: True if a running launcher received the command
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(get_server_name(username))
+    if not socket.waitForConnected(timeout):
+        return False
+
+    message = json.dumps({'command': command, 'arguments': list(arguments)}) + '\n'
+    socket.write(message.encode('utf-8'))
+    if not socket.waitForBytesWritten(timeout):
+        return False
+
+    received = socket.waitForReadyRead(timeout) and bytes(socket.readLine()).strip() == b'ok'
+    socket.disconnectFromServer()
+    return received
+
+
+def forward_to_running_instance(argv):
+    """ If --single-instance is given and a launcher already runs for the user,
+    send it the command of the command line instead of starting another one.
+
+    Only QtCore and QtNetwork are imported, so this is fast.
+
+    Args:
+        argv (list): Command line arguments
+
+    Returns:
+        bool: True if the command has been handled by the running launcher
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--single-instance', action='store_true')
+    parser.add_argument('-u', '--username', default=getpass.getuser().lower())
+    parser.add_argument('--reload', action='store_true')
+    parser.add_argument('--launch')
+    parser.add_argument('--option')
+    args, _ = parser.parse_known_args(argv)
+
+    if not args.single_instance:
+        return False
+
+    if args.launch:
+        arguments = [args.launch] + ([args.option] if args.option else list())
+        return send_command(args.username, 'launch', arguments)
+    if args.reload:
+        return send_command(args.username, 'reload')
+    return send_command(args.username, 'show')
+
+
+class InstanceServer(QObject):
+    """ Listen to commands sent by launchers started after this one, for the same user.
+    """
+    command_received = Signal(str, list)
+
+    def __init__(self, username, parent=None):
+        QObject.__init__(self, parent)
+        self.server_name = get_server_name(username)
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._accept)
+
+    def listen(self):
+        """ Returns:
+            bool: False if another launcher already listens for the user
+        """
+        if self._server.listen(self.server_name):
+            return True
+
+        # the name may be left by a launcher that crashed
+        socket = QLocalSocket()
+        socket.connectToServer(self.server_name)
+        if socket.waitForConnected(CONNECTION_TIMEOUT):
+            socket.disconnectFromServer()
+            return False
+
+        QLocalServer.removeServer(self.server_name)
+        if not self._server.listen(self.server_name):
+            logging.error("InstanceServer: can't listen on {0}: {1}".format(
+                self.server_name, self._server.errorString()
+            ))
+            return False
+        return True
+
+    def _accept(self):
+        while self._server.hasPendingConnections():
+            socket = self._server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self._read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def _read(self, socket):
+        while socket.canReadLine():
+            line = bytes(socket.readLine()).decode('utf-8').strip()
+            try:
+                message = json.loads(line)
+                command = message['command']
+                arguments = [str(argument) for argument in message.get('arguments', list())]
+            except (ValueError, KeyError, TypeError):
+                logging.warning("InstanceServer: invalid message {0!r}".format(line))
+                socket.write(b'error\n')
+                continue
+
+            if command not in COMMANDS:
+                logging.warning("InstanceServer: unknown command {0}".format(command))
+                socket.write(b'error\n')
+                continue
+
+            socket.write(b'ok\n')
+            socket.flush()
+            self.command_received.emit(command, arguments)
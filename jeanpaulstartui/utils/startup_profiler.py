@@ -0,0 +1,131 @@
+import sys
+import json
+import time
+import socket
+import logging
+import platform
+import contextlib
+
+
+_profiler = None
+
+
+def get_profiler():
+    """ Get the startup profiler of the process. It is disabled unless enable_profiler() was called.
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler(enabled=False)
+    return _profiler
+
+
+def enable_profiler(report_filepath, cprofile_filepath=None, origin=None, cpu_origin=None):
+    global _profiler
+    _profiler = StartupProfiler(
+        enabled=True,
+        report_filepath=report_filepath,
+        cprofile_filepath=cprofile_filepath,
+        origin=origin,
+        cpu_origin=cpu_origin
+    )
+    return _profiler
+
+
+class StartupProfiler(object):
+    """ Record wall and CPU time of the startup phases, and write them as a JSON report.
+
+    Phases are timed with `phase()`. Events (first paint, discovery finished) are instants
+    relative to the origin. The report is written once every awaited event happened.
+    CPU times are process wide, threads included. The optional cProfile only covers the GUI thread.
+    """
+    def __init__(self, enabled=True, report_filepath=None, cprofile_filepath=None, origin=None, cpu_origin=None):
+        self.enabled = enabled
+        self.report_filepath = report_filepath
+        self.cprofile_filepath = cprofile_filepath
+        self.origin = time.perf_counter() if origin is None else origin
+        self.cpu_origin = time.process_time() if cpu_origin is None else cpu_origin
+        self.phases = list()
+        self.events = dict()
+        self._awaited_events = set()
+        self._cprofile = None
+        self._done = False
+
+    def start_cprofile(self):
+        if not self.enabled or not self.cprofile_filepath:
+            return
+        import cProfile
+        self._cprofile = cProfile.Profile()
+        self._cprofile.enable()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        if not self.enabled or self._done:
+            yield
+            return
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, wall_start, cpu_start)
+
+    def record(self, name, wall_start, cpu_start, wall_end=None, cpu_end=None):
+        """ Record a phase timed by the caller.
+        """
+        if not self.enabled or self._done:
+            return
+        wall_end = time.perf_counter() if wall_end is None else wall_end
+        cpu_end = time.process_time() if cpu_end is None else cpu_end
+        self.phases.append({
+            'name': name,
+            'start': wall_start - self.origin,
+            'wall': wall_end - wall_start,
+            'cpu': cpu_end - cpu_start
+        })
+
+    def wait_for(self, *names):
+        self._awaited_events.update(names)
+
+    def event(self, name):
+        """ Record an instant. The report is written once every awaited event happened.
+        """
+        if not self.enabled or self._done or name in self.events:
+            return
+        self.events[name] = time.perf_counter() - self.origin
+        if self._awaited_events.issubset(self.events):
+            self.finish()
+
+    def report(self):
+        return {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'host': socket.gethostname(),
+            'argv': sys.argv,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'wall': time.perf_counter() - self.origin,
+            'cpu': time.process_time() - self.cpu_origin,
+            'phases': self.phases,
+            'events': self.events
+        }
+
+    def finish(self):
+        if not self.enabled or self._done:
+            return
+        self._done = True
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            try:
+                self._cprofile.dump_stats(self.cprofile_filepath)
+            except OSError as exc:
+                logging.error("StartupProfiler: can't write {0}.  exc: {1}".format(self.cprofile_filepath, exc))
+
+        report = self.report()
+        try:
+            with open(self.report_filepath, 'w') as report_file:
+                json.dump(report, report_file, indent=2)
+        except OSError as exc:
+            logging.error("StartupProfiler: can't write {0}.  exc: {1}".format(self.report_filepath, exc))
+            return
+        logging.info("StartupProfiler: startup report written to {0}".format(self.report_filepath))
@@ -0,0 +1,82 @@
+import os
+import json
+import time
+import logging
+import collections
+
+
+USAGE_HISTORY_FILE = "jps_usage_history.jsonl"
+MAX_RECORDS = 5000
+
+
+class UsageHistory(object):
+    """ Count the launches of each batch, in an append-only JSON lines file.
+
+    Recording a launch appends a single line, so it is cheap and a crash can't lose more than that line.
+    Once the file holds more than `max_records` lines, it is compacted to one line per batch.
+    """
+    def __init__(self, filepath=None, max_records=MAX_RECORDS):
+        self.filepath = filepath or _get_usage_history_filepath()
+        self.max_records = max_records
+        self.counts = collections.Counter()
+        self._record_count = 0
+
+    def load(self):
+        self.counts.clear()
+        self._record_count = 0
+        try:
+            with open(self.filepath, 'r') as history_file:
+                for line in history_file:
+                    try:
+                        record = json.loads(line)
+                        self.counts[record['batch']] += int(record.get('count', 1))
+                    except (ValueError, KeyError, TypeError):
+                        # last line of a launcher that crashed while writing it
+                        continue
+                    self._record_count += 1
+        except FileNotFoundError:
+            pass
+        except OSError as exc:
+            logging.error("JPS UI: Can't read usage history file.  exc: {}".format(exc))
+
+    def record(self, batch_name, option_name=None):
+        """ Record a launch of a batch.
+        """
+        self.counts[batch_name] += 1
+        line = json.dumps({'batch': batch_name, 'option': option_name, 'time': time.time()})
+
+        try:
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            with open(self.filepath, 'a') as history_file:
+                history_file.write(line + '\n')
+        except OSError:
+            logging.error("JPS UI: Can't write usage history file.")
+            return
+
+        self._record_count += 1
+        if self._record_count > self.max_records:
+            self._compact()
+
+    def most_used_first(self, batches):
+        """ Sort batches by launch count, batches launched as often keep their order.
+        """
+        return sorted(batches, key=lambda batch: -self.counts.get(batch.name, 0))
+
+    def _compact(self):
+        temporary_filepath = self.filepath + '.tmp'
+        try:
+            with open(temporary_filepath, 'w') as history_file:
+                for batch_name, count in self.counts.items():
+                    history_file.write(json.dumps({'batch': batch_name, 'count': count}) + '\n')
+            os.replace(temporary_filepath, self.filepath)
+        except OSError:
+            logging.error("JPS UI: Can't compact usage history file.")
+            return
+        self._record_count = len(self.counts)
+
+
+def _get_usage_history_filepath():
+    return os.path.join(
+        os.path.expanduser('~/.jeanpaulstart'),
+        USAGE_HISTORY_FILE
+    ).replace('\\', '/')
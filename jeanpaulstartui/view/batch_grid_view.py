@@ -0,0 +1,142 @@
+from PySide6.QtGui import *
+from PySide6.QtCore import *
+from PySide6.QtWidgets import *
+
+from jeanpaulstartui.view.batch_model import BatchRole, VersionRole
+
+
+TEXT_COLOR = QColor(239, 240, 241)
+VERSION_COLOR = QColor(128, 128, 128)
+BORDER_COLOR = QColor(35, 38, 41)
+HIGHLIGHT_COLOR = QColor(61, 174, 233)
+
+
+def menu_entries(batch):
+    """ Get the entries of the menu of a batch: its options (old staging system), its stagings,
+    or its old versions, opened from the name label only.
+
+    Returns:
+        tuple: (list of option names or None, True if the menu is opened from the name only)
+    """
+    if batch.options:
+        return [option.name for option in batch.options], False
+    if batch.stagings is not None:
+        return list(batch.stagings), False
+    if batch.old_versions:
+        return list(batch.old_versions), True
+    return None, False
+
+
+class BatchDelegate(QStyledItemDelegate):
+    """ Paint a batch as the batch buttons of LauncherWidget: icon, name and version badge.
+    """
+    def __init__(self, dpix, parent=None):
+        QStyledItemDelegate.__init__(self, parent)
+        self.dpix = dpix
+
+    def sizeHint(self, option, index):
+        return QSize(self.dpix, self.dpix)
+
+    def name_rect(self, rect):
+        return QRect(rect.left() + 4, rect.bottom() - rect.height() // 3, rect.width() - 8, rect.height() // 3 - 4)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = option.rect.adjusted(1, 1, -1, -1)
+
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        painter.setPen(QPen(HIGHLIGHT_COLOR if hovered else BORDER_COLOR, 2))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRoundedRect(rect, 4, 4)
+
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None:
+            icon_rect = QRect(rect.left(), rect.top() + 12, rect.width(), rect.height() - rect.height() // 3 - 12)
+            target = QRect(QPoint(0, 0), pixmap.size().scaled(icon_rect.size(), Qt.KeepAspectRatio))
+            target.moveCenter(icon_rect.center())
+            painter.drawPixmap(target, pixmap)
+
+        painter.setPen(TEXT_COLOR)
+        painter.drawText(
+            self.name_rect(rect),
+            Qt.AlignHCenter | Qt.AlignBottom | Qt.TextWordWrap,
+            index.data(Qt.DisplayRole)
+        )
+
+        version = index.data(VersionRole)
+        if version:
+            painter.setPen(VERSION_COLOR)
+            painter.drawText(rect.adjusted(4, 4, -8, -4), Qt.AlignRight | Qt.AlignTop, version)
+
+        painter.restore()
+
+
+class BatchGridView(QListView):
+    """ Grid of batches painted by a delegate: only the visible tiles are painted,
+    no widget is created per batch.
+
+    Clicking a tile emits batch_clicked, or opens the options, stagings or old versions menu,
+    built when opened. batch_hovered is emitted when the pointer moves to another tile or menu entry,
+    with None when it leaves them.
+    """
+    batch_clicked = Signal(object, object)
+    batch_hovered = Signal(object, object)
+
+    def __init__(self, dpix, parent=None):
+        QListView.__init__(self, parent)
+        self.delegate = BatchDelegate(dpix, self)
+        self.setItemDelegate(self.delegate)
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(256)
+        self.setUniformItemSizes(True)
+        self.setWrapping(True)
+        self.setSpacing(8)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setMouseTracking(True)
+        self.viewport().setCursor(QCursor(Qt.PointingHandCursor))
+        self._hovered_batch = None
+
+    def mouseMoveEvent(self, event):
+        index = self.indexAt(event.position().toPoint())
+        self._set_hovered_batch(index.data(BatchRole) if index.isValid() else None)
+        QListView.mouseMoveEvent(self, event)
+
+    def leaveEvent(self, event):
+        self._set_hovered_batch(None)
+        QListView.leaveEvent(self, event)
+
+    def _set_hovered_batch(self, batch):
+        if batch is self._hovered_batch:
+            return
+        self._hovered_batch = batch
+        self.batch_hovered.emit(batch, batch.version if batch is not None else None)
+
+    def mouseReleaseEvent(self, event):
+        index = self.indexAt(event.position().toPoint())
+        if event.button() == Qt.LeftButton and index.isValid():
+            self._activate(index, event.position().toPoint())
+        QListView.mouseReleaseEvent(self, event)
+
+    def _activate(self, index, position):
+        batch = index.data(BatchRole)
+        entries, from_name_only = menu_entries(batch)
+
+        on_name = self.delegate.name_rect(self.visualRect(index)).contains(position)
+        if entries is None or (from_name_only and not on_name):
+            self.batch_clicked.emit(batch, batch.version)
+            return
+
+        menu = QMenu(self)
+        for entry in entries:
+            menu.addAction(entry).setData(entry)
+        menu.hovered.connect(lambda action: self.batch_hovered.emit(batch, action.data()))
+        action = menu.exec(self.viewport().mapToGlobal(position))
+        menu.deleteLater()
+        if action is not None:
+            self.batch_clicked.emit(batch, action.data())
@@ -0,0 +1,107 @@
+import os
+import functools
+
+from PySide6.QtCore import *
+
+
+BatchRole = Qt.UserRole + 1
+VersionRole = Qt.UserRole + 2
+
+
+def icon_size(batch, dpix):
+    return int(dpix/2.4 if batch.version else dpix/2)
+
+
+class BatchListModel(QAbstractListModel):
+    """ Batches as a list model, for the virtualized batch grid.
+
+    Icons are only requested to the icon cache when a view asks for them,
+    so only the tiles painted at least once are decoded.
+    """
+    def __init__(self, icon_cache, dpix, parent=None):
+        QAbstractListModel.__init__(self, parent)
+        self.icon_cache = icon_cache
+        self.dpix = dpix
+        self.priorities = dict()
+        self._batches = list()
+        self._icon_keys = list()
+        self._rows_by_icon_key = dict()
+        self._icons = dict()
+        self._requested_icons = set()
+
+    @property
+    def batches(self):
+        return list(self._batches)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._batches)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._batches):
+            return None
+
+        batch = self._batches[index.row()]
+        if role == Qt.DisplayRole:
+            return batch.name
+        if role == Qt.ToolTipRole:
+            return batch.description or None
+        if role == Qt.DecorationRole:
+            return self._icon(index.row())
+        if role == BatchRole:
+            return batch
+        if role == VersionRole:
+            return batch.version
+        return None
+
+    def set_batches(self, batches, append=False):
+        """ Set the batches of the model.
+
+        Args:
+            batches (list): Batches
+            append (bool): If True, batches are added after the existing ones
+        """
+        if append:
+            if not batches:
+                return
+            self.beginInsertRows(QModelIndex(), len(self._batches), len(self._batches) + len(batches) - 1)
+            self._batches.extend(batches)
+            self._index_icon_keys(batches)
+            self.endInsertRows()
+            return
+
+        self.beginResetModel()
+        self._batches = list(batches)
+        self._icon_keys = list()
+        self._rows_by_icon_key = dict()
+        self._index_icon_keys(self._batches)
+        self.endResetModel()
+
+    def _index_icon_keys(self, batches):
+        """ Keep the icon key of each row, and the rows of each key, for loaded icons to only update their rows.
+        """
+        for batch in batches:
+            key = self._icon_key(batch)
+            self._rows_by_icon_key.setdefault(key, list()).append(len(self._icon_keys))
+            self._icon_keys.append(key)
+
+    def _icon_key(self, batch):
+        return os.path.expandvars(batch.icon_path), icon_size(batch, self.dpix)
+
+    def _icon(self, row):
+        key = self._icon_keys[row]
+        batch = self._batches[row]
+        if key not in self._requested_icons:
+            self._requested_icons.add(key)
+            self.icon_cache.request(
+                key[0], key[1], functools.partial(self._icon_loaded, key),
+                priority=self.priorities.get(batch.name, 0)
+            )
+        return self._icons.get(key)
+
+    def _icon_loaded(self, key, pixmap):
+        self._icons[key] = pixmap
+        for row in self._rows_by_icon_key.get(key, list()):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
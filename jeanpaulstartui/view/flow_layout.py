@@ -1,9 +1,14 @@
+import shiboken6
 from PySide6.QtWidgets import *
 from PySide6.QtCore import *
 
 """
 Flow Layout from
 https://github.com/PySide/Examples/blob/master/examples/layouts/flowlayout.py
+
+Size hints, spacings and heights for a given width are cached until the layout is invalidated.
+When every item has the same size hint (batch buttons have a fixed size),
+positions are computed as a grid instead of walking the items.
 """
 
 
@@ -12,18 +17,20 @@ class FlowLayout(QLayout):
     def __init__(self, parent=None, margin=0, spacing=-1):
         QLayout.__init__(self, parent)
         self.item_list = []
+        self._geometry_cache = None
+        self._heights = dict()
 
         if parent is None:
-            self.setMargin(margin)
+            self.setContentsMargins(margin, margin, margin, margin)
             self.setSpacing(spacing)
 
     def __del__(self):
-        item = self.takeAt(0)
-        while item:
-            item = self.takeAt(0)
+        # no invalidate() here, the Qt layout may already be deleted
+        del self.item_list[:]
 
     def addItem(self, item):
         self.item_list.append(item)
+        self.invalidate()
 
     def count(self):
         return len(self.item_list)
@@ -35,10 +42,42 @@ class FlowLayout(QLayout):
 
     def takeAt(self, index):
         if index >= 0 and index < len(self.item_list):
-            return self.item_list.pop(index)
+            item = self.item_list.pop(index)
+            self.invalidate()
+            return item
 
         return None
 
+    def remove_widgets(self, widgets):
+        """ Remove the items of the given widgets in a single pass, where removeWidget()
+        walks the whole layout for each widget. Items are deleted, widgets are not.
+        """
+        widgets = set(widgets)
+        item_list = list()
+        for item in self.item_list:
+            if item.widget() in widgets:
+                # items are created and owned by Qt, dropping them from the list would leak them
+                shiboken6.delete(item)
+            else:
+                item_list.append(item)
+        self.item_list = item_list
+        self.invalidate()
+
+    def sort_widgets(self, widgets):
+        """ Order the items of the layout as the given widgets.
+        Every widget of the layout has to be given.
+        """
+        items = {item.widget(): item for item in self.item_list}
+        item_list = [items[widget] for widget in widgets]
+        if item_list != self.item_list:
+            self.item_list = item_list
+            self.invalidate()
+
+    def invalidate(self):
+        self._geometry_cache = None
+        self._heights.clear()
+        super(FlowLayout, self).invalidate()
+
     def expandingDirections(self):
         return Qt.Orientations(Qt.Orientation(0))
 
@@ -46,7 +85,10 @@ class FlowLayout(QLayout):
         return True
 
     def heightForWidth(self, width):
-        height = self.do_layout(QRect(0, 0, width, 0))
+        height = self._heights.get(width)
+        if height is None:
+            height = self.do_layout(QRect(0, 0, width, 0))
+            self._heights[width] = height
         return height
 
     def setGeometry(self, rect):
@@ -60,29 +102,74 @@ class FlowLayout(QLayout):
         size = QSize(2 * self.contentsMargins().top(), 2 * self.contentsMargins().top())
         return size
 
+    def _geometry(self):
+        """ Get the visible items with their size hint, the spacings,
+        and the size shared by every item if any.
+        """
+        if self._geometry_cache is not None:
+            return self._geometry_cache
+
+        items = list()
+        space_x = space_y = self.spacing()
+        for item in self.item_list:
+            widget = item.widget()
+            if widget is None or item.isEmpty():
+                continue
+            if not items:
+                space_x = self.spacing() + widget.style().layoutSpacing(QSizePolicy.PushButton,
+                                                                        QSizePolicy.PushButton, Qt.Horizontal)
+                space_y = self.spacing() + widget.style().layoutSpacing(QSizePolicy.PushButton,
+                                                                        QSizePolicy.PushButton, Qt.Vertical) + 1
+            items.append((item, item.sizeHint()))
+
+        sizes = set((size.width(), size.height()) for _, size in items)
+        uniform_size = QSize(*sizes.pop()) if len(sizes) == 1 else None
+
+        self._geometry_cache = items, space_x, space_y, uniform_size
+        return self._geometry_cache
+
     def do_layout(self, rect, test_only=True):
+        items, space_x, space_y, uniform_size = self._geometry()
+        if not items:
+            return 0
+
+        if uniform_size is not None:
+            return self._do_grid_layout(rect, items, space_x, space_y, uniform_size, test_only)
+        return self._do_flow_layout(rect, items, space_x, space_y, test_only)
+
+    def _do_flow_layout(self, rect, items, space_x, space_y, test_only):
         x = rect.x()
         y = rect.y()
         line_height = 0
 
-        for item in self.item_list:
-            widget = item.widget()
-            space_x = self.spacing() + widget.style().layoutSpacing(QSizePolicy.PushButton,
-                                                                    QSizePolicy.PushButton, Qt.Horizontal)
-            space_y = self.spacing() + widget.style().layoutSpacing(QSizePolicy.PushButton,
-                                                                    QSizePolicy.PushButton, Qt.Vertical) + 1
-            next_x = x + item.sizeHint().width() + space_x
+        for item, size in items:
+            next_x = x + size.width() + space_x
             if next_x - space_x > rect.right() and line_height > 0:
                 x = rect.x()
                 y = y + line_height + space_y
-                next_x = x + item.sizeHint().width() + space_x
+                next_x = x + size.width() + space_x
                 line_height = 0
 
             if not test_only:
-                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
+                item.setGeometry(QRect(QPoint(x, y), size))
 
             x = next_x
 
-            line_height = max(line_height, item.sizeHint().height())
+            line_height = max(line_height, size.height())
 
         return y + line_height - rect.y()
+
+    def _do_grid_layout(self, rect, items, space_x, space_y, size, test_only):
+        """ Same result as the generic layout, when every item has the same size.
+        """
+        step_x = size.width() + space_x
+        step_y = size.height() + space_y
+        columns = max(1, (rect.width() - 1 - size.width()) // step_x + 1)
+        rows = (len(items) + columns - 1) // columns
+
+        if not test_only:
+            for index, (item, _) in enumerate(items):
+                row, column = divmod(index, columns)
+                item.setGeometry(QRect(QPoint(rect.x() + column * step_x, rect.y() + row * step_y), size))
+
+        return rows * step_y - space_y
@@ -1,6 +1,6 @@
 import os
-import logging
 import functools
+import collections
 
 from PySide6.QtGui import *
 from PySide6.QtCore import *
@@ -10,22 +10,70 @@ from .flow_layout import FlowLayout
 
 from jeanpaulstartui import ROOT
 from jeanpaulstartui.view.progress_label import ProgressLabel
+from jeanpaulstartui.view.batch_model import BatchListModel
+from jeanpaulstartui.view.batch_grid_view import BatchGridView, menu_entries
+from jeanpaulstartui.view.search_index import BatchSearchIndex
 from jeanpaulstartui.utils import window_cache
+from jeanpaulstartui.utils.icon_cache import IconCache
+from jeanpaulstartui.utils.startup_profiler import get_profiler
+
+
+STATUS_FRAME_RATE = 30
+# time the pointer rests on a batch before its launch is prepared, in milliseconds
+HOVER_DELAY = 200
+# batches indexed for the search per event loop turn, after a populate
+SEARCH_INDEX_CHUNK = 100
 
 
 def _clear_layout(layout):
-    for i in reversed(range(layout.count())):
-        layout.itemAt(i).widget().deleteLater()
+    widgets = [layout.itemAt(index).widget() for index in range(layout.count())]
+    layout.remove_widgets(widgets)
+    for widget in widgets:
+        widget.deleteLater()
+
+
+def _batch_key(batch):
+    """ Identity of a batch button: a button can be reused for a batch with the same key.
+    """
+    return batch.name, batch.version, batch.icon_path
+
+
+def _label_as_button(batch):
+    return bool(batch.version and batch.stagings is None)
+
+
+def _menu_signature(batch):
+    return (
+        tuple(option.name for option in batch.options or list()),
+        tuple(batch.stagings) if batch.stagings is not None else None,
+        tuple(batch.old_versions or list())
+    )
+
+
+class BatchButton(QPushButton):
+    """ Push button telling when the pointer enters or leaves it.
+    """
+    entered = Signal()
+    left = Signal()
+
+    def enterEvent(self, event):
+        QPushButton.enterEvent(self, event)
+        self.entered.emit()
+
+    def leaveEvent(self, event):
+        QPushButton.leaveEvent(self, event)
+        self.left.emit()
 
 
 class LauncherWidget(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, virtual_view=False, release_menus=False):
         QWidget.__init__(self, parent=parent)
 
         self.mouse_pressed = False
         self.offset = QCursor()
         self.window_icon = QIcon(ROOT + '/resources/ceci-n-est-pas-une-icone.png')
-        window_cache.restore_window_geometry(self)
+        with get_profiler().phase('restore_window_geometry'):
+            window_cache.restore_window_geometry(self)
 
         self.setMouseTracking(True)
         self.setObjectName('LauncherWidget')
@@ -33,32 +81,89 @@ class LauncherWidget(QWidget):
         self.setWindowIcon(self.window_icon)
         self.setMinimumSize(385, 144)
 
-        batches_widget = QWidget()
-        self.batches_layout = FlowLayout(parent=batches_widget, spacing=0)
-        batches_widget.setLayout(self.batches_layout)
-        batches_widget.setContentsMargins(16, 16, 16, 16)
-        self.batches_layout.setSpacing(16)
-
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidget(batches_widget)
-        self.scroll_area.setWidgetResizable(True)
+        self.icon_cache = IconCache(self)
+
+        if virtual_view:
+            # the grid view scrolls by itself and only paints the visible batches
+            self.batches_layout = None
+            self.batches_model = BatchListModel(self.icon_cache, self.physicalDpiX(), self)
+            self.batches_view = BatchGridView(self.physicalDpiX())
+            self.batches_view.setModel(self.batches_model)
+            self.batches_view.batch_clicked.connect(self._grid_batch_clicked)
+            self.batches_view.batch_hovered.connect(self._batch_hovered)
+            self.scroll_area = self.batches_view
+        else:
+            self.batches_model = None
+            self.batches_view = None
+            batches_widget = QWidget()
+            self.batches_layout = FlowLayout(parent=batches_widget, spacing=0)
+            batches_widget.setLayout(self.batches_layout)
+            batches_widget.setContentsMargins(16, 16, 16, 16)
+            self.batches_layout.setSpacing(16)
+
+            self.scroll_area = QScrollArea()
+            self.scroll_area.setWidget(batches_widget)
+            self.scroll_area.setWidgetResizable(True)
 
         self.status_progress_bar = ProgressLabel()
         self.status_progress_bar.setFixedHeight(15)
         self.status_progress_bar.setObjectName("status")
+        self.status_progress_bar.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.status_progress_bar.customContextMenuRequested.connect(self._show_runs_menu)
+
+        # status updates sent on every executor step are coalesced, at most STATUS_FRAME_RATE per second
+        self._pending_status = dict()
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(1000 // STATUS_FRAME_RATE)
+        self._status_timer.timeout.connect(self._flush_status)
+
+        self._hovered_batch = None
+        self._hover_timer = QTimer(self)
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(HOVER_DELAY)
+        self._hover_timer.timeout.connect(self._batch_rested)
+
+        self.search_edit = QLineEdit()
+        self.search_edit.setObjectName('search')
+        self.search_edit.setPlaceholderText('Search batches')
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self._apply_search)
+        self.search_edit.hide()
+        self.search_shortcut = QShortcut(QKeySequence.Find, self)
+        self.search_shortcut.activated.connect(self.show_search)
+
+        # the search index is built from the event loop, a few batches at a time
+        self._search_index = BatchSearchIndex()
+        self._unindexed_batches = collections.deque()
+        self._search_index_timer = QTimer(self)
+        self._search_index_timer.setInterval(0)
+        self._search_index_timer.timeout.connect(self._index_next_batches)
+
+        self.placeholder_label = QLabel('Looking for batches...')
+        self.placeholder_label.setObjectName('placeholder')
+        self.placeholder_label.setAlignment(Qt.AlignCenter)
 
         self.main_layout = QVBoxLayout(self)
+        self.main_layout.addWidget(self.search_edit)
+        self.main_layout.addWidget(self.placeholder_label)
         self.main_layout.addWidget(self.scroll_area)
         self.main_layout.addWidget(self.status_progress_bar)
         self.main_layout.setContentsMargins(8, 8, 8, 8)
 
         self.controller = None
+        # if True, the actions of batch menus are deleted once closed, and created again on next opening
+        self.release_menus = release_menus
+        self._batch_buttons = list()
+        self._runs = dict()
+        self._batch_priorities = dict()
+        self._buttons_by_icon_key = None
+        # indices of the batches matching the search, None once batches are populated again
+        self._matches = None
+        self._every_index_cache = frozenset()
 
         self.show()
 
-    def refresh(self):
-        QApplication.processEvents()
-
     def set_hourglass(self, is_hourglass):
         if is_hourglass:
             QApplication.setOverrideCursor(Qt.WaitCursor)
@@ -66,17 +171,91 @@ class LauncherWidget(QWidget):
             QApplication.restoreOverrideCursor()
 
     def set_status_message(self, message):
-        self.status_progress_bar.setText(message)
+        self._schedule_status('message', message)
 
     def set_progress(self, value):
-        self.status_progress_bar.set_progress(value)
+        self._schedule_status('progress', value)
+
+    def set_remaining_time(self, seconds):
+        self._schedule_status('remaining_time', seconds)
+
+    def _schedule_status(self, name, value):
+        self._pending_status[name] = value
+        if not self._status_timer.isActive():
+            self._status_timer.start()
+
+    def _flush_status(self):
+        """ Show the last status message, progress and remaining time set since the last flush.
+        """
+        pending_status, self._pending_status = self._pending_status, dict()
+        if 'message' in pending_status:
+            self.status_progress_bar.setText(pending_status['message'])
+        if 'progress' in pending_status:
+            self.status_progress_bar.set_progress(pending_status['progress'])
+        if 'remaining_time' in pending_status:
+            self.status_progress_bar.set_remaining_time(pending_status['remaining_time'])
+
+    def show_placeholder(self, text):
+        self.placeholder_label.setText(text)
+        self.placeholder_label.show()
 
     def set_version(self, version):
         self.set_status_message(version)
 
+    def set_batch_priorities(self, priorities):
+        """ Set the priority of batches: buttons and icons of higher priority batches are made first.
+
+        Args:
+            priorities (dict): {batch name: priority}, batches missing have priority 0
+        """
+        self._batch_priorities = priorities
+        if self.batches_model is not None:
+            self.batches_model.priorities = priorities
+
+    def add_run(self, run_id, title):
+        self._runs[run_id] = title
+        self.status_progress_bar.setToolTip(self._runs_tooltip())
+
+    def remove_run(self, run_id):
+        self._runs.pop(run_id, None)
+        self.status_progress_bar.setToolTip(self._runs_tooltip())
+
+    def _runs_tooltip(self):
+        if not self._runs:
+            return ''
+        return 'Running: {0}\nRight click to cancel, Esc cancels the last one'.format(
+            ', '.join(self._runs.values())
+        )
+
+    def _show_runs_menu(self, position):
+        """ Show a menu with a cancel action for each running batch.
+        """
+        if not self._runs:
+            return
+
+        runs_menu = QMenu(self)
+        for run_id, title in self._runs.items():
+            runs_menu.addAction('Cancel ' + title).setData(run_id)
+        if len(self._runs) > 1:
+            runs_menu.addSeparator()
+            runs_menu.addAction('Cancel all')
+        action = runs_menu.exec(self.status_progress_bar.mapToGlobal(position))
+        runs_menu.deleteLater()
+
+        if action is None:
+            return
+        if action.data() is None:
+            self.controller.cancel_all_runs()
+        else:
+            self.controller.cancel_run(action.data())
+
     def show(self):
         return QWidget.show(self)
 
+    def paintEvent(self, event):
+        get_profiler().event('first_paint')
+        QWidget.paintEvent(self, event)
+
     def closeEvent(self, event):
         window_cache.save_window_geometry(self)
         event.accept()
@@ -88,37 +267,272 @@ class LauncherWidget(QWidget):
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_F5:
             self.reload_batches()
+        elif event.key() == Qt.Key_Escape and self.search_edit.isVisible():
+            self.hide_search()
+        elif event.key() == Qt.Key_Escape and self._runs:
+            self.controller.cancel_run(next(reversed(self._runs)))
+        elif event.text().isprintable() and event.text().strip() and not self.search_edit.isVisible():
+            # typing anywhere starts a search
+            self.show_search()
+            self.search_edit.insert(event.text())
+            return
         QWidget.keyPressEvent(self, event)
 
+    def show_search(self):
+        self.search_edit.show()
+        self.search_edit.setFocus()
+        self.search_edit.selectAll()
+
+    def hide_search(self):
+        self.search_edit.clear()
+        self.search_edit.hide()
+        self.scroll_area.setFocus()
+
     def reload_batches(self):
         self.showNormal()
-        QApplication.setOverrideCursor(Qt.BusyCursor)
         self.controller.update()
-        QApplication.restoreOverrideCursor()
 
-    def populate_layout(self, batches):
-        _clear_layout(self.batches_layout)
-        for batch in batches:
-            batch_button = self._make_batch_button(batch)
-            self.batches_layout.addWidget(batch_button)
+    def populate_layout(self, batches, append=False, reconcile=True):
+        """ Show buttons for the given batches.
+
+        By default, existing buttons are reconciled with the batches: buttons are reused for batches
+        with the same name, version and icon, only the changed ones are updated, created or removed.
+
+        Args:
+            batches (list): Batches to show
+            append (bool): If True, buttons are added after the existing ones instead of replacing them
+            reconcile (bool): If False, every button is deleted and created again
+        """
+        with get_profiler().phase('populate_layout'):
+            self._populate_layout(batches, append, reconcile)
+            if append:
+                self._unindexed_batches.extend(batches)
+            else:
+                self._search_index = BatchSearchIndex()
+                self._unindexed_batches = collections.deque(self._shown_batches())
+            self._search_index_timer.start()
+            self._matches = None
+            self._apply_search(self.search_edit.text())
+
+    def _populate_layout(self, batches, append, reconcile):
+        if batches:
+            self.placeholder_label.hide()
+
+        if self.batches_model is not None:
+            self.batches_model.set_batches(batches, append=append)
+            return
+
+        # Qt shows each new button on its own, from the event loop, and lays out the whole
+        # flow layout each time: the layout is disabled while buttons are shown all at once.
+        self.batches_layout.setEnabled(False)
+        try:
+            self._populate_buttons(batches, append, reconcile)
+            for button in self._batch_buttons:
+                if button.isHidden() and not button.filtered_out:
+                    button.show()
+        finally:
+            self.batches_layout.setEnabled(True)
+            self.batches_layout.invalidate()
+
+    def _populate_buttons(self, batches, append, reconcile):
+        if append:
+            for button in self._make_batch_buttons(batches):
+                self._add_batch_button(button)
+            return
+
+        if not reconcile:
+            _clear_layout(self.batches_layout)
+            self._batch_buttons = list()
+            for button in self._make_batch_buttons(batches):
+                self._add_batch_button(button)
+            return
+
+        available_buttons = collections.defaultdict(collections.deque)
+        for button in self._batch_buttons:
+            available_buttons[button.batch_key].append(button)
+
+        buttons = [None] * len(batches)
+        reused_icon_keys = set()
+        for index, batch in enumerate(batches):
+            reusable_buttons = available_buttons.get(_batch_key(batch))
+            if reusable_buttons:
+                buttons[index] = self._update_batch_button(reusable_buttons.popleft(), batch)
+                reused_icon_keys.add(buttons[index].icon_key)
+
+        missing_indices = [index for index, button in enumerate(buttons) if button is None]
+        new_buttons = self._make_batch_buttons([batches[index] for index in missing_indices])
+        for index, button in zip(missing_indices, new_buttons):
+            self.batches_layout.addWidget(button)
+            buttons[index] = button
+
+        removed_buttons = [button for buttons_left in available_buttons.values() for button in buttons_left]
+        self.batches_layout.remove_widgets(removed_buttons)
+        for button in removed_buttons:
+            button.deleteLater()
+
+        self.batches_layout.sort_widgets(buttons)
+        self._batch_buttons = buttons
+        self._buttons_by_icon_key = None
+        self._refresh_icons(reused_icon_keys)
+
+    def _refresh_icons(self, icon_keys):
+        """ Icons may have been edited in place: the icon cache checks them once per icon,
+        and the buttons showing an icon that changed are updated.
+        """
+        for icon_key in icon_keys:
+            self.icon_cache.request(*icon_key, functools.partial(self._icon_changed, icon_key), changed_only=True)
+
+    def _icon_changed(self, icon_key, pixmap):
+        if self._buttons_by_icon_key is None:
+            self._buttons_by_icon_key = collections.defaultdict(list)
+            for button in self._batch_buttons:
+                self._buttons_by_icon_key[button.icon_key].append(button)
+        for button in self._buttons_by_icon_key.get(icon_key, list()):
+            button.icon_label.setPixmap(pixmap)
+
+    def _shown_batches(self):
+        if self.batches_model is not None:
+            return self.batches_model.batches
+        return [button.batch for button in self._batch_buttons]
+
+    def _shown_batch_count(self):
+        if self.batches_model is not None:
+            return self.batches_model.rowCount()
+        return len(self._batch_buttons)
+
+    def _apply_search(self, text):
+        """ Hide the batches not matching the search text.
+        Only the batches entering or leaving the previous matches are touched, no button is created or deleted.
+        """
+        if not text.split():
+            matches = self._every_index()
+        else:
+            self._index_next_batches(len(self._unindexed_batches))
+            matches = self._search_index.search(text)
+
+        if self._matches is None:
+            changed_indices = range(self._shown_batch_count())
+        elif matches is self._matches:
+            return
+        else:
+            changed_indices = matches.symmetric_difference(self._matches)
+        self._matches = matches
+
+        if self.batches_model is not None:
+            for row in changed_indices:
+                hidden = row not in matches
+                if self.batches_view.isRowHidden(row) != hidden:
+                    self.batches_view.setRowHidden(row, hidden)
+            return
+
+        # showing a button lays out the whole flow layout: it is disabled while buttons are toggled
+        self.batches_layout.setEnabled(False)
+        changed = False
+        try:
+            for index in changed_indices:
+                button = self._batch_buttons[index]
+                filtered_out = index not in matches
+                if button.filtered_out != filtered_out:
+                    button.filtered_out = filtered_out
+                    button.setVisible(not filtered_out)
+                    changed = True
+        finally:
+            self.batches_layout.setEnabled(True)
+        if changed:
+            self.batches_layout.invalidate()
+
+    def _every_index(self):
+        count = self._shown_batch_count()
+        if len(self._every_index_cache) != count:
+            self._every_index_cache = frozenset(range(count))
+        return self._every_index_cache
+
+    def _index_next_batches(self, count=SEARCH_INDEX_CHUNK):
+        if self._unindexed_batches:
+            count = min(count, len(self._unindexed_batches))
+            self._search_index.add(self._unindexed_batches.popleft() for _ in range(count))
+        if not self._unindexed_batches:
+            self._search_index_timer.stop()
+
+    def _make_batch_buttons(self, batches):
+        """ Make the buttons of the batches, higher priority batches first,
+        so their icons are the first to be loaded.
+
+        Returns:
+            list: Buttons, in the order of the batches
+        """
+        buttons = [None] * len(batches)
+        for index in sorted(range(len(batches)), key=lambda index: -self._batch_priority(batches[index])):
+            buttons[index] = self._make_batch_button(batches[index])
+        return buttons
+
+    def _batch_priority(self, batch):
+        return self._batch_priorities.get(batch.name, 0)
+
+    def _add_batch_button(self, button):
+        self.batches_layout.addWidget(button)
+        self._batch_buttons.append(button)
+        self._buttons_by_icon_key = None
+
+    def _remove_batch_button(self, button):
+        self.batches_layout.remove_widgets([button])
+        button.deleteLater()
+
+    def _update_batch_button(self, button, batch):
+        """ Update a button shown for a batch with the same key.
+        The button is created again if its layout differs.
+
+        Returns:
+            QPushButton: The updated button
+        """
+        if button.label_as_button != _label_as_button(batch):
+            self._remove_batch_button(button)
+            button = self._make_batch_button(batch)
+            self.batches_layout.addWidget(button)
+            return button
+
+        button.batch = batch
+        if button.toolTip() != (batch.description or ''):
+            button.setToolTip(batch.description or '')
+        if button.menu_signature != _menu_signature(batch):
+            self._setup_menu(batch, button, button.name_label)
+        return button
+
+    def _grid_batch_clicked(self, batch, option_name):
+        self._hover_timer.stop()
+        self.controller.batch_clicked(batch, option_name)
+
+    def _batch_button_clicked(self, button):
+        self._hover_timer.stop()
+        self.controller.batch_clicked(button.batch, button.batch.version)
+
+    def _batch_menu_triggered(self, button, option_name):
+        self._hover_timer.stop()
+        self.controller.batch_clicked(button.batch, option_name)
+
+    def _batch_button_entered(self, button):
+        self._batch_hovered(button.batch, button.batch.version)
+
+    def _batch_hovered(self, batch, option_name):
+        """ The launch of a batch is prepared once the pointer rested on it for HOVER_DELAY.
+        """
+        if batch is None:
+            self._hovered_batch = None
+            self._hover_timer.stop()
+            return
+        self._hovered_batch = (batch, option_name)
+        self._hover_timer.start()
+
+    def _batch_rested(self):
+        if self._hovered_batch is not None and self.controller is not None:
+            self.controller.batch_hovered(*self._hovered_batch)
 
     def _make_batch_button(self, batch):
-        button = QPushButton(self)
+        button = BatchButton(self)
         button_icon = QLabel()
         dpix = self.physicalDpiX()
-
-        image_path = os.path.expandvars(batch.icon_path)
-        if os.path.isfile(image_path):
-            image = QImage(image_path)
-        else:
-            image = QImage(2, 2, QImage.Format_RGB16)
-            logging.warning("Impossible to find " + image_path)
-        button_icon.setPixmap(QPixmap.fromImage(image.scaled(
-            dpix/2.4 if batch.version else dpix/2,
-            dpix/2.4 if batch.version else dpix/2,
-            Qt.KeepAspectRatioByExpanding,
-            Qt.SmoothTransformation
-        )))
+        button.icon_key = (os.path.expandvars(batch.icon_path), dpix/2.4 if batch.version else dpix/2)
+        self.icon_cache.request(*button.icon_key, button_icon.setPixmap, priority=self._batch_priority(batch))
 
         button_icon.setAlignment(Qt.AlignCenter)
         button_icon.setTextInteractionFlags(Qt.NoTextInteraction)
@@ -126,7 +540,7 @@ class LauncherWidget(QWidget):
         button_icon.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         button_icon.setContentsMargins(0, 8, 0, 0)
 
-        label = self._setup_label_name(batch.name, batch.version and batch.stagings is None)
+        label = self._setup_label_name(batch.name, _label_as_button(batch))
         if batch.description:
             button.setToolTip(batch.description)
 
@@ -147,9 +561,15 @@ class LauncherWidget(QWidget):
         button.setLayout(button_layout)
         button.setCursor(QCursor(Qt.PointingHandCursor))
         button.batch = batch
+        button.batch_key = _batch_key(batch)
+        button.name_label = label
+        button.icon_label = button_icon
+        button.label_as_button = _label_as_button(batch)
+        button.filtered_out = False
         self._setup_menu(batch, button, label)
-        on_click = functools.partial(self.controller.batch_clicked, batch, batch.version)
-        button.clicked.connect(on_click)
+        button.clicked.connect(functools.partial(self._batch_button_clicked, button))
+        button.entered.connect(functools.partial(self._batch_button_entered, button))
+        button.left.connect(functools.partial(self._batch_hovered, None, None))
         return button
 
     def _setup_label_name(self, text, as_button=False):
@@ -175,7 +595,7 @@ class LauncherWidget(QWidget):
             label = QPushButton(_add_return_line(text, 15))
             label.setMouseTracking(False)
             label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-            label.setStyleSheet('QPushButton::menu-indicator { image: none; width: 0px; }')
+            label.setObjectName('batch_name')
         return label
 
     def _setup_version_label(self, version, parent_widget, dpix):
@@ -188,35 +608,53 @@ class LauncherWidget(QWidget):
         version_text.setMouseTracking(False)
         version_text.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         version_text.setGeometry(0, 0, dpix - 10, dpix)
-        version_text.setStyleSheet('QLabel { color: #808080; }')
+        version_text.setObjectName('batch_version')
 
     def _setup_menu(self, batch, button, label):
-        """ Create a menu for the button.
+        """ Create a menu for the button, replacing the previous one if any.
         If the batch has options, create a menu with the options (old staging system).
         If the batch has stagings, create a menu with the stagings.
-        If the batch has old versions, create a menu with the versions.
+        If the batch has old versions, create a menu with the versions, on the label.
+        The menu is empty until it is opened.
         """
-        if batch.options:
-            options_menu = QMenu(button)
-            for option in batch.options:
-                option_action = options_menu.addAction(option.name)
-                on_click = functools.partial(self.controller.batch_clicked, batch, option.name)
-                option_action.triggered.connect(on_click)
-            button.setMenu(options_menu)
-        elif batch.stagings is not None:
-            staging_menu = QMenu(button)
-            for staging in batch.stagings:
-                staging_action = staging_menu.addAction(staging)
-                on_click = functools.partial(self.controller.batch_clicked, batch, staging)
-                staging_action.triggered.connect(on_click)
-            button.setMenu(staging_menu)
-        elif batch.old_versions:
-            versions_menu = QMenu(button)
-            for version in batch.old_versions:
-                version_action = versions_menu.addAction(version)
-                on_click = functools.partial(self.controller.batch_clicked, batch, version)
-                version_action.triggered.connect(on_click)
-            label.setMenu(versions_menu)
+        for widget in (button, label):
+            if isinstance(widget, QPushButton) and widget.menu() is not None:
+                previous_menu = widget.menu()
+                widget.setMenu(None)
+                previous_menu.deleteLater()
+        button.menu_signature = _menu_signature(batch)
+
+        option_names, from_name_only = menu_entries(batch)
+        if option_names is None:
+            return
+        (label if from_name_only else button).setMenu(self._make_menu(button))
+
+    def _make_menu(self, button):
+        # actions aren't connected one by one: Python slots connected to QAction.triggered
+        # keep the action wrappers alive after the menu is deleted
+        menu = QMenu(button)
+        menu.aboutToShow.connect(functools.partial(self._fill_menu, button, menu))
+        menu.aboutToHide.connect(functools.partial(self._release_menu, menu))
+        menu.triggered.connect(functools.partial(self._batch_menu_action_triggered, button))
+        menu.hovered.connect(functools.partial(self._batch_menu_action_hovered, button))
+        return menu
+
+    def _fill_menu(self, button, menu):
+        if not menu.isEmpty():
+            return
+        for option_name in menu_entries(button.batch)[0] or list():
+            menu.addAction(option_name).setData(option_name)
+
+    def _release_menu(self, menu):
+        if self.release_menus:
+            # the triggered action is handled after the menu hides
+            QTimer.singleShot(0, menu, menu.clear)
+
+    def _batch_menu_action_triggered(self, button, action):
+        self._batch_menu_triggered(button, action.data())
+
+    def _batch_menu_action_hovered(self, button, action):
+        self._batch_hovered(button.batch, action.data())
 
 def _add_return_line(string, length):
     """ Add return line at given string each time it reaches a given length
@@ -1,23 +1,58 @@
 from PySide6.QtGui import *
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QRect
 from PySide6.QtWidgets import *
 
 
-class ProgressLabel(QLabel):
+BAR_TOP = 13
+
+
+def _format_remaining_time(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return '~{0}s left'.format(seconds)
+    return '~{0}m{1:02d}s left'.format(seconds // 60, seconds % 60)
+
 
+class ProgressLabel(QLabel):
+    """ Label with a progress bar under its text.
+    Only the part of the bar that changed is repainted when the progress is set.
+    """
     def __init__(self, parent=None):
         QLabel.__init__(self, parent=parent)
         self._progress = 0.0
+        self._remaining_time_text = ''
 
     def set_progress(self, value):
+        previous_width = self._bar_width()
         self._progress = value
+        width = self._bar_width()
+        if width != previous_width:
+            left = min(width, previous_width)
+            self.update(QRect(left, BAR_TOP, max(width, previous_width) - left, self.height() - BAR_TOP))
+
+    def set_remaining_time(self, seconds):
+        """ Show the estimated remaining time on the right, or nothing if seconds is None.
+        """
+        remaining_time_text = _format_remaining_time(seconds) if seconds is not None else ''
+        if remaining_time_text != self._remaining_time_text:
+            self._remaining_time_text = remaining_time_text
+            self.update()
+
+    def _bar_width(self):
+        return int(round(self.width() * self._progress))
 
     def paintEvent(self, event):
         painter = QPainter()
         painter.begin(self)
         painter.setPen(Qt.NoPen)
         painter.setBrush(QColor(61, 174, 233))
-        painter.drawRect(event.rect().adjusted(0, 13, -self.width()*(1 - self._progress), 0))
+        painter.drawRect(QRect(0, BAR_TOP, self._bar_width(), self.height() - BAR_TOP).intersected(event.rect()))
         painter.end()
 
         QLabel.paintEvent(self, event)
+
+        if self._remaining_time_text:
+            painter.begin(self)
+            painter.setPen(self.palette().color(QPalette.WindowText))
+            painter.drawText(self.contentsRect(), Qt.AlignRight | Qt.AlignTop, self._remaining_time_text)
+            painter.end()
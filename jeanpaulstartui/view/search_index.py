@@ -0,0 +1,123 @@
+import re
+
+
+_WORD_SEPARATORS = re.compile(r'[\s_\-./\\:,;()\[\]]+')
+_PREFIX_LENGTH = 2
+
+
+def _trigrams(text):
+    return set(text[index:index + 3] for index in range(len(text) - 2))
+
+
+def _batch_text(batch):
+    fields = [batch.name, batch.description, batch.version]
+    fields.extend(getattr(batch, 'tags', None) or list())
+    return ' '.join(str(field) for field in fields if field).lower()
+
+
+class BatchSearchIndex(object):
+    """ Index batches by name, description, version and tags, for type-ahead filtering.
+
+    A batch matches if it matches every word of the query:
+    words shorter than 3 characters match the start of a word (prefix index),
+    longer ones match anywhere in a word (trigram index over the distinct words).
+    Query words holding separators are looked for in the whole text of the batches.
+    Results are cached by query word, since type-ahead queries share most of their words.
+    Batches can be indexed a few at a time with add(), their indices follow the order they are added in.
+    """
+    def __init__(self, batches=()):
+        self._texts = list()
+        self._prefixes = dict()
+        self._word_postings = dict()
+        self._word_trigrams = dict()
+        self._matches = dict()
+        self.add(batches)
+
+    def add(self, batches):
+        """ Index batches after the ones already indexed.
+        """
+        self._matches.clear()
+        for batch in batches:
+            index = len(self._texts)
+            text = _batch_text(batch)
+            self._texts.append(text)
+            for word in _WORD_SEPARATORS.split(text):
+                if not word:
+                    continue
+                postings = self._word_postings.get(word)
+                if postings is None:
+                    postings = self._word_postings[word] = set()
+                    for trigram in _trigrams(word):
+                        self._word_trigrams.setdefault(trigram, set()).add(word)
+                postings.add(index)
+                for length in range(1, min(len(word), _PREFIX_LENGTH) + 1):
+                    self._prefixes.setdefault(word[:length], set()).add(index)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def search(self, query):
+        """ Get the indices of the batches matching the query.
+
+        Args:
+            query (str): Words to look for
+
+        Returns:
+            frozenset: Indices of the matching batches, in the order they were indexed
+        """
+        words = query.lower().split()
+        if not words:
+            return frozenset(range(len(self._texts)))
+
+        matches = None
+        for word in sorted(words, key=len, reverse=True):
+            word_matches = self._search_word(word)
+            matches = word_matches if matches is None else matches & word_matches
+            if not matches:
+                return frozenset()
+        return matches
+
+    def _search_word(self, word):
+        matches = self._matches.get(word)
+        if matches is not None:
+            return matches
+
+        if len(word) <= _PREFIX_LENGTH:
+            matches = frozenset(self._prefixes.get(word, ()))
+        elif _WORD_SEPARATORS.search(word):
+            matches = self._search_text(word)
+        else:
+            matches = self._search_words(word)
+
+        self._matches[word] = matches
+        return matches
+
+    def _search_words(self, word):
+        """ Batches having a word that contains the given word.
+        """
+        trigram_sets = sorted((self._word_trigrams.get(trigram, ()) for trigram in _trigrams(word)), key=len)
+        words = set(trigram_sets[0])
+        for trigram_set in trigram_sets[1:]:
+            if not words:
+                break
+            words &= trigram_set
+
+        matches = set()
+        for candidate in words:
+            if word in candidate:
+                matches |= self._word_postings[candidate]
+        return frozenset(matches)
+
+    def _search_text(self, text):
+        """ Batches whose whole text contains the given text.
+        Candidates are the batches having the long enough parts of the text.
+        """
+        candidates = None
+        for part in _WORD_SEPARATORS.split(text):
+            if len(part) > _PREFIX_LENGTH:
+                part_matches = self._search_words(part)
+                candidates = part_matches if candidates is None else candidates & part_matches
+
+        if candidates is None:
+            candidates = range(len(self._texts))
+        return frozenset(index for index in candidates if text in self._texts[index])
@@ -0,0 +1,14 @@
+from jeanpaulstartui import ROOT
+
+
+STYLESHEET_FILEPATH = ROOT + '/resources/stylesheet.css'
+
+
+def apply_stylesheet(app):
+    """ Style the whole application with the shared stylesheet, read once.
+
+    Widgets are styled with object name selectors, never with a stylesheet of their own:
+    Qt would parse and polish a separate style for each batch button.
+    """
+    with open(STYLESHEET_FILEPATH, 'r') as stylesheet_file:
+        app.setStyleSheet(stylesheet_file.read())
@@ -31,5 +31,12 @@ setup(
     author_email=AUTHOR_EMAIL,
     packages=find_packages(exclude=['tests']),
     install_requires=_requirements,
-    include_package_data=True
+    include_package_data=True,
+    entry_points={
+        'console_scripts': [
+            'jeanpaulstartui = jeanpaulstartui.__main__:run',
+            'jeanpaulstartui-headless = jeanpaulstartui.headless:main',
+            'jeanpaulstartui-report = jeanpaulstartui.telemetry_report:main'
+        ]
+    }
 )
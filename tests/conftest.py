@@ -0,0 +1,115 @@
+import os
+import threading
+
+import pytest
+
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+class FakeOption(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeBatch(object):
+    """ The attributes of a jeanpaulstart batch the launcher reads.
+    """
+    def __init__(self, name, version=None, description=None, tags=None, icon_path='missing-icon.png',
+                 options=None, stagings=None, old_versions=None):
+        self.name = name
+        self.version = version
+        self.description = description
+        self.tags = tags or list()
+        self.icon_path = icon_path
+        self.options = [FakeOption(option) for option in options or list()]
+        self.stagings = stagings
+        self.old_versions = old_versions or list()
+
+
+class FakeTask(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class StubExecutor(object):
+    """ A jeanpaulstart Executor running the given tasks.
+
+    Args:
+        task_names (list): Tasks run, in order
+        failing_task (str): Task after which the executor stops without success
+        raising_task (str): Task whose step raises
+        paused_task (str): Task whose step waits for `resume` to be set, `paused` is set meanwhile
+    """
+    def __init__(self, task_names, failing_task=None, raising_task=None, paused_task=None):
+        self.tasks = [FakeTask(name) for name in task_names]
+        self.failing_task = failing_task
+        self.raising_task = raising_task
+        self.paused_task = paused_task
+        self.paused = threading.Event()
+        self.resume = threading.Event()
+        self.index = 0
+        self.success = True
+        self.messages = list()
+        self.steps = list()
+
+    @property
+    def has_stopped(self):
+        return not self.success or self.index >= len(self.tasks)
+
+    @property
+    def next_task(self):
+        return self.tasks[self.index]
+
+    @property
+    def progress(self):
+        return float(self.index) / len(self.tasks)
+
+    def step(self):
+        task_name = self.next_task.name
+        self.steps.append(task_name)
+        if task_name == self.paused_task:
+            self.paused.set()
+            self.resume.wait(5)
+        if task_name == self.raising_task:
+            raise RuntimeError("{0} exploded".format(task_name))
+        if task_name == self.failing_task:
+            self.success = False
+            self.messages.append('[{0}][copy failed]'.format(task_name))
+        self.index += 1
+
+
+@pytest.fixture
+def stub_executor(monkeypatch):
+    """ Make the executor built by the next runs, in place of jeanpaulstart.Executor.
+    """
+    executors = list()
+
+    def stub_executor(*args, **kwargs):
+        executor = StubExecutor(*args, **kwargs)
+        executors.append(executor)
+        return executor
+
+    jeanpaulstart = pytest.importorskip('jeanpaulstart')
+    monkeypatch.setattr(jeanpaulstart, 'Executor', lambda batch, option_name: executors[-1])
+    return stub_executor
+
+
+@pytest.fixture
+def fake_batch():
+    return FakeBatch
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    """ Keep window geometry, caches and histories out of the user's home.
+    """
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
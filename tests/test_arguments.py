@@ -0,0 +1,28 @@
+import argparse
+import threading
+
+from jeanpaulstartui import arguments
+
+
+def test_slow_directories_are_kept(tmp_path, monkeypatch):
+    readable_directory = str(tmp_path)
+    slow_directory = str(tmp_path / 'slow')
+    missing_directory = str(tmp_path / 'missing')
+    released = threading.Event()
+    is_readable_directory = arguments._is_readable_directory
+
+    def hung_is_readable_directory(directory):
+        if directory == slow_directory:
+            # a network mount that doesn't answer
+            released.wait(10)
+        return is_readable_directory(directory)
+
+    monkeypatch.setattr(arguments, '_is_readable_directory', hung_is_readable_directory)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batches', action=arguments.ReadableDirectory)
+    try:
+        args = parser.parse_args(['--batches', ';'.join([slow_directory, missing_directory, readable_directory])])
+    finally:
+        released.set()
+
+    assert args.batches == [slow_directory, readable_directory]
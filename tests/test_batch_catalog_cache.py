@@ -0,0 +1,71 @@
+import os
+import pickle
+
+import pytest
+
+from jeanpaulstartui.utils import batch_catalog_cache
+from jeanpaulstartui.utils.batch_catalog_cache import catalog_key, load_catalog, save_catalog
+
+
+DIRECTORIES = {'/batches/maya': {'fingerprint': {'maya.yml': 1.0}, 'batches': ['maya'], 'elasticsearch': False,
+                                 'resolved_at': 0.0}}
+
+
+def _key(username='user'):
+    return catalog_key(['/batches/maya'], username, None)
+
+
+def _cache_filepath():
+    return batch_catalog_cache._get_batch_catalog_cache_filepath()
+
+
+def _outdated_version():
+    with open(_cache_filepath(), 'wb') as cache_file:
+        pickle.dump({'version': batch_catalog_cache.BATCH_CATALOG_CACHE_VERSION - 1, 'key': _key(),
+                     'directories': DIRECTORIES}, cache_file)
+
+
+def _truncated():
+    with open(_cache_filepath(), 'rb') as cache_file:
+        content = cache_file.read()
+    with open(_cache_filepath(), 'wb') as cache_file:
+        cache_file.write(content[:len(content) // 2])
+
+
+def _corrupted():
+    with open(_cache_filepath(), 'wb') as cache_file:
+        cache_file.write(b'not a pickle')
+
+
+def test_catalog_is_loaded_with_the_same_key():
+    save_catalog(_key(), DIRECTORIES)
+    assert load_catalog(_key()) == DIRECTORIES
+
+
+def test_missing_catalog():
+    assert load_catalog(_key()) is None
+
+
+def test_catalog_saved_with_another_key_is_ignored():
+    save_catalog(_key(), DIRECTORIES)
+    assert load_catalog(_key(username='other user')) is None
+    assert load_catalog(_key()) == DIRECTORIES
+
+
+def test_catalog_of_another_format_version_is_ignored():
+    save_catalog(_key(), DIRECTORIES)
+    _outdated_version()
+    assert load_catalog(_key()) is None
+
+
+@pytest.mark.parametrize('damage', [_truncated, _corrupted])
+def test_damaged_catalog_is_ignored_and_deleted(damage):
+    save_catalog(_key(), DIRECTORIES)
+    damage()
+
+    assert load_catalog(_key()) is None
+    assert not os.path.exists(_cache_filepath())
+
+    # the next discovery saves a catalog that can be read again
+    save_catalog(_key(), DIRECTORIES)
+    assert load_catalog(_key()) == DIRECTORIES
@@ -0,0 +1,117 @@
+import time
+import threading
+
+import pytest
+
+
+jeanpaulstart = pytest.importorskip('jeanpaulstart')
+
+from jeanpaulstartui.utils.batch_catalog_cache import directory_fingerprint  # noqa: E402
+from jeanpaulstartui.utils.batch_discovery import DirectoryDiscovery  # noqa: E402
+
+
+class _Gate(object):
+    """ A gate whose server answered the first check, and answers the next ones if `answers` is True.
+    """
+    def __init__(self, answers):
+        self.answers = answers
+        self.rechecks = 0
+
+    def is_available(self):
+        return True
+
+    def recheck(self):
+        self.rechecks += 1
+        return self.answers
+
+
+@pytest.fixture
+def slow_batches_for_user(monkeypatch):
+    """ A batches_for_user that takes 0.3s, counting how many calls run at once.
+    """
+    calls = {'running': 0, 'max_running': 0, 'elasticsearch_urls': list()}
+    lock = threading.Lock()
+
+    def batches_for_user(**kwargs):
+        with lock:
+            calls['running'] += 1
+            calls['max_running'] = max(calls['max_running'], calls['running'])
+            calls['elasticsearch_urls'].append(kwargs['elasticsearch_url'])
+        time.sleep(0.3)
+        with lock:
+            calls['running'] -= 1
+        return ['batch']
+
+    monkeypatch.setattr(jeanpaulstart, 'batches_for_user', batches_for_user)
+    return calls
+
+
+def _discover(tmp_path, last_entry=None, query_budget=0.05, answers=True, **kwargs):
+    gate = _Gate(answers)
+    discovery = DirectoryDiscovery(
+        0, str(tmp_path), 'user', None,
+        elasticsearch_url='http://elasticsearch:9200', last_entry=last_entry,
+        elasticsearch_gate=gate, query_budget=query_budget, **kwargs
+    )
+    results = {'found': list(), 'degraded': list()}
+    discovery.signals.found.connect(lambda generation, directory, entry: results['found'].append(entry))
+    discovery.signals.degraded.connect(lambda generation, directory, note: results['degraded'].append(note))
+    discovery.run()
+    return gate, results
+
+
+def _changed_elasticsearch_entry():
+    return {'fingerprint': None, 'batches': ['old batch'], 'elasticsearch': True, 'resolved_at': 0}
+
+
+@pytest.mark.parametrize('answers', [True, False])
+def test_slow_call_without_last_entry_is_awaited(tmp_path, slow_batches_for_user, answers):
+    gate, results = _discover(tmp_path, answers=answers)
+
+    assert gate.rechecks == 1
+    assert slow_batches_for_user['elasticsearch_urls'] == ['http://elasticsearch:9200']
+    assert slow_batches_for_user['max_running'] == 1
+    assert results['found'][0]['batches'] == ['batch']
+    assert results['found'][0]['elasticsearch']
+
+
+def test_slow_parsing_is_awaited(tmp_path, slow_batches_for_user):
+    # Elasticsearch still answers: the time went to the batch files, which changed
+    gate, results = _discover(tmp_path, last_entry=_changed_elasticsearch_entry(), answers=True)
+
+    assert gate.rechecks == 1
+    assert not results['degraded']
+    assert results['found'][0]['batches'] == ['batch']
+
+
+def test_slow_elasticsearch_falls_back_to_last_entry(tmp_path, slow_batches_for_user):
+    gate, results = _discover(tmp_path, last_entry=_changed_elasticsearch_entry(), answers=False)
+
+    assert gate.rechecks == 1
+    assert results['degraded'] == ["Elasticsearch unreachable, showing last known batches"]
+    assert results['found'][0]['batches'] is None
+    assert len(slow_batches_for_user['elasticsearch_urls']) == 1
+
+
+def _elasticsearch_entry(tmp_path, age):
+    return {
+        'fingerprint': directory_fingerprint(str(tmp_path)), 'batches': ['old batch'],
+        'elasticsearch': True, 'resolved_at': time.time() - age
+    }
+
+
+def test_recent_elasticsearch_entry_is_reused(tmp_path, slow_batches_for_user):
+    _, results = _discover(tmp_path, _elasticsearch_entry(tmp_path, 10), reuse_last_entry=True, elasticsearch_ttl=60)
+
+    assert not slow_batches_for_user['elasticsearch_urls']
+    assert results['found'][0]['batches'] is None
+
+
+def test_expired_elasticsearch_entry_is_resolved_again(tmp_path, slow_batches_for_user):
+    # the launcher reuses the catalog at startup and on watcher reloads
+    _, results = _discover(
+        tmp_path, _elasticsearch_entry(tmp_path, 120), query_budget=None, reuse_last_entry=True, elasticsearch_ttl=60
+    )
+
+    assert slow_batches_for_user['elasticsearch_urls'] == ['http://elasticsearch:9200']
+    assert results['found'][0]['batches'] == ['batch']
@@ -0,0 +1,48 @@
+import pytest
+
+from PySide6.QtCore import Qt
+
+
+class _IconCache(object):
+    def __init__(self):
+        self.requests = dict()
+
+    def request(self, image_path, target_size, callback, priority=0):
+        self.requests[image_path] = callback
+
+
+@pytest.fixture
+def model(qapp):
+    from jeanpaulstartui.view.batch_model import BatchListModel
+    return BatchListModel(_IconCache(), 96)
+
+
+def _changed_rows(model, image_path):
+    rows = list()
+    model.dataChanged.connect(lambda top_left, bottom_right, roles: rows.append(top_left.row()))
+    model.icon_cache.requests[image_path]('pixmap')
+    return rows
+
+
+def test_loaded_icon_updates_the_rows_showing_it(model, fake_batch):
+    model.set_batches([
+        fake_batch('Maya', icon_path='maya.png'),
+        fake_batch('Nuke', icon_path='nuke.png'),
+        fake_batch('Maya Legacy', icon_path='maya.png')
+    ])
+    for row in range(3):
+        assert model.data(model.index(row), Qt.DecorationRole) is None
+    assert sorted(model.icon_cache.requests) == ['maya.png', 'nuke.png']
+
+    assert _changed_rows(model, 'maya.png') == [0, 2]
+    assert model.data(model.index(2), Qt.DecorationRole) == 'pixmap'
+
+
+def test_appended_and_reset_batches_are_updated(model, fake_batch):
+    model.set_batches([fake_batch('Maya', icon_path='maya.png')])
+    model.set_batches([fake_batch('Nuke', icon_path='nuke.png'), fake_batch('Maya', icon_path='maya.png')])
+    model.set_batches([fake_batch('Houdini', icon_path='maya.png')], append=True)
+    model.data(model.index(0), Qt.DecorationRole)
+    model.data(model.index(1), Qt.DecorationRole)
+
+    assert _changed_rows(model, 'maya.png') == [1, 2]
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+
+jeanpaulstart = pytest.importorskip('jeanpaulstart')
+
+from jeanpaulstartui.utils.batch_run import BatchRun, CANCELLED_MESSAGE  # noqa: E402
+
+
+def _run(fake_batch):
+    run = BatchRun(7, fake_batch('maya'))
+    signals = list()
+    run.signals.status.connect(lambda *args: signals.append(('status',) + args))
+    run.signals.progress.connect(lambda *args: signals.append(('progress',) + args))
+    run.signals.finished.connect(lambda *args: signals.append(('finished',) + args))
+    return run, signals
+
+
+def test_finished_run(fake_batch, stub_executor):
+    executor = stub_executor(['copy', 'launch'])
+    run, signals = _run(fake_batch)
+    run.run()
+
+    assert executor.steps == ['copy', 'launch']
+    assert signals == [
+        ('status', 7, 'copy'), ('progress', 7, 0.0, -1.0),
+        ('status', 7, 'launch'), ('progress', 7, 0.5, -1.0),
+        ('finished', 7, True, ''),
+    ]
+    assert [task_name for task_name, _ in run.task_durations] == ['copy', 'launch']
+    assert run.duration is not None
+
+
+def test_failed_run(fake_batch, stub_executor):
+    stub_executor(['copy', 'launch'], failing_task='copy')
+    run, signals = _run(fake_batch)
+    run.run()
+
+    assert signals[-1] == ('finished', 7, False, '[copy : copy failed]')
+    assert [signal[2] for signal in signals if signal[0] == 'status'] == ['copy']
+
+
+def test_raising_run(fake_batch, stub_executor):
+    stub_executor(['copy', 'launch'], raising_task='launch')
+    run, signals = _run(fake_batch)
+    run.run()
+
+    assert signals[-1] == ('finished', 7, False, 'launch exploded')
+    assert [task_name for task_name, _ in run.task_durations] == ['copy', 'launch']
+
+
+def test_run_cancelled_during_a_task(qapp, fake_batch, stub_executor):
+    executor = stub_executor(['copy', 'launch', 'cleanup'], paused_task='copy')
+    run, signals = _run(fake_batch)
+    thread = threading.Thread(target=run.run)
+    thread.start()
+
+    assert executor.paused.wait(5)
+    run.cancel()
+    executor.resume.set()
+    thread.join(5)
+    # signals sent from another thread are queued
+    qapp.processEvents()
+
+    # the running task ends, the next ones aren't run
+    assert executor.steps == ['copy']
+    assert run.is_cancelled
+    assert signals[-1] == ('finished', 7, False, CANCELLED_MESSAGE)
+    assert [signal[2] for signal in signals if signal[0] == 'status'] == ['copy']
+    assert [task_name for task_name, _ in run.task_durations] == ['copy']
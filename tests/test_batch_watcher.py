@@ -0,0 +1,63 @@
+import os
+import time
+import threading
+
+import pytest
+
+from jeanpaulstartui.utils import batch_watcher
+from jeanpaulstartui.utils.batch_watcher import BatchWatcher
+
+
+def _wait(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def batch_directory(tmp_path):
+    directory = tmp_path / 'batches'
+    (directory / 'maya').mkdir(parents=True)
+    (directory / 'maya' / 'maya.yml').write_text('name: Maya')
+    return str(directory)
+
+
+def test_directories_are_walked_outside_of_the_gui_thread(qapp, batch_directory, monkeypatch):
+    walk = os.walk
+    released = threading.Event()
+
+    def hung_walk(directory):
+        # a network mount that doesn't answer
+        released.wait(5)
+        return walk(directory)
+
+    monkeypatch.setattr(batch_watcher.os, 'walk', hung_walk)
+    start = time.monotonic()
+    watcher = BatchWatcher([batch_directory], debounce_delay=10)
+    watcher.start()
+    assert time.monotonic() - start < 1.0
+
+    released.set()
+    assert _wait(qapp, lambda: not watcher._walks)
+    assert os.path.join(batch_directory, 'maya', 'maya.yml') in watcher._file_system_watcher.files()
+    watcher.stop()
+
+
+def test_new_files_are_watched(qapp, batch_directory):
+    watcher = BatchWatcher([batch_directory], debounce_delay=10)
+    changes = list()
+    watcher.directories_changed.connect(changes.append)
+    watcher.start()
+    assert _wait(qapp, lambda: not watcher._walks)
+
+    os.mkdir(os.path.join(batch_directory, 'nuke'))
+    assert _wait(qapp, lambda: changes)
+    assert changes[0] == [batch_directory]
+
+    nuke_filepath = os.path.join(batch_directory, 'nuke', 'nuke.yml')
+    with open(nuke_filepath, 'w') as nuke_file:
+        nuke_file.write('name: Nuke')
+    assert _wait(qapp, lambda: nuke_filepath in watcher._file_system_watcher.files())
+    watcher.stop()
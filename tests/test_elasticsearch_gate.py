@@ -0,0 +1,99 @@
+import time
+import socket
+import threading
+import http.server
+
+import pytest
+
+from jeanpaulstartui.utils.elasticsearch_gate import BudgetExceeded, ElasticsearchGate, call_with_budget
+
+
+IDLE_TIMEOUT = 0.2
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """ Answers like a healthy HTTP/1.1 server, closing connections idle for IDLE_TIMEOUT seconds.
+    """
+    protocol_version = 'HTTP/1.1'
+    timeout = IDLE_TIMEOUT
+
+    def do_HEAD(self):
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server):
+    return 'http://127.0.0.1:{0}/'.format(server.server_address[1])
+
+
+def test_server_that_answers_is_available(server):
+    gate = ElasticsearchGate(_url(server), budget=1.0)
+    assert gate.is_available()
+
+
+def test_idle_connection_closed_by_the_server_isnt_a_failure(server):
+    gate = ElasticsearchGate(_url(server), budget=1.0, ttl=0)
+    assert gate.is_available()
+
+    time.sleep(IDLE_TIMEOUT * 3)
+    assert gate.is_available()
+    assert gate.is_available()
+
+
+def test_server_errors_are_unavailable(server):
+    server.status = 503
+    gate = ElasticsearchGate(_url(server), budget=1.0)
+    assert not gate.is_available()
+
+
+def test_unreachable_server_is_cached_until_retry():
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    port = listener.getsockname()[1]
+    listener.close()
+
+    gate = ElasticsearchGate('http://127.0.0.1:{0}/'.format(port), budget=1.0, retry_delay=60)
+    assert not gate.is_available()
+    checked_at = gate._checked_at
+    assert not gate.is_available()
+    assert gate._checked_at == checked_at
+
+
+def test_call_with_budget():
+    assert call_with_budget(lambda value: value * 2, 1.0, 21) == 42
+    with pytest.raises(BudgetExceeded):
+        call_with_budget(time.sleep, 0.05, 1.0)
+    with pytest.raises(KeyError):
+        call_with_budget(dict().__getitem__, 1.0, 'missing')
+
+
+def test_exceeded_call_can_be_awaited():
+    with pytest.raises(BudgetExceeded) as exc_info:
+        call_with_budget(lambda: time.sleep(0.2) or 'late', 0.05)
+    assert exc_info.value.wait() == 'late'
+
+
+def test_recheck_ignores_the_cached_answer(server):
+    gate = ElasticsearchGate(_url(server), budget=1.0, ttl=60)
+    assert gate.is_available()
+
+    server.status = 503
+    assert gate.is_available()
+    assert not gate.recheck()
+    assert not gate.is_available()
@@ -0,0 +1,76 @@
+import pytest
+from PySide6.QtCore import QRect, QSize
+from PySide6.QtWidgets import QPushButton, QWidget
+
+from jeanpaulstartui.view.flow_layout import FlowLayout
+
+
+WIDTHS = [1, 60, 100, 101, 250, 333, 1000]
+
+
+@pytest.fixture
+def make_layout(qapp):
+    widgets = list()
+
+    def make_layout(count, spacing, hidden=()):
+        widget = QWidget()
+        widgets.append(widget)
+        layout = FlowLayout(widget, spacing=spacing)
+        layout.setSpacing(spacing)
+        for index in range(count):
+            button = QPushButton(str(index))
+            button.setFixedSize(QSize(50, 40))
+            layout.addWidget(button)
+            if index in hidden:
+                button.hide()
+        return layout
+
+    yield make_layout
+    for widget in widgets:
+        widget.deleteLater()
+
+
+def _widths(layout):
+    """ Some widths, and the widths around each column count change, where an item fits exactly.
+    """
+    _, space_x, _, size = layout._geometry()
+    step_x = size.width() + space_x
+    widths = set(WIDTHS)
+    for columns in range(1, 6):
+        fitting_width = columns * step_x - space_x
+        widths.update([fitting_width - 1, fitting_width, fitting_width + 1])
+    return sorted(widths)
+
+
+def _layout(layout, rect, grid):
+    """ Lay the items out with the grid or the generic flow, give the height and the visible item positions.
+    """
+    items, space_x, space_y, uniform_size = layout._geometry()
+    assert uniform_size is not None
+    if grid:
+        height = layout._do_grid_layout(rect, items, space_x, space_y, uniform_size, False)
+    else:
+        height = layout._do_flow_layout(rect, items, space_x, space_y, False)
+    return height, [item.geometry() for item, _ in items]
+
+
+@pytest.mark.parametrize('spacing', [0, 6, 13])
+@pytest.mark.parametrize('hidden', [(), (0, 3, 4, 11)])
+@pytest.mark.parametrize('origin', [(0, 0), (9, 7)])
+def test_grid_layout_places_items_as_the_flow_layout(make_layout, spacing, hidden, origin):
+    layout = make_layout(17, spacing, hidden)
+    assert len(layout._geometry()[0]) == 17 - len(hidden)
+
+    for width in _widths(layout):
+        rect = QRect(origin[0], origin[1], width, 0)
+        assert _layout(layout, rect, grid=True) == _layout(layout, rect, grid=False), width
+
+
+@pytest.mark.parametrize('hidden', [(), (1, 2)])
+def test_height_for_width_matches_the_flow_layout(make_layout, hidden):
+    layout = make_layout(9, 6, hidden)
+    items, space_x, space_y, _ = layout._geometry()
+
+    for width in _widths(layout):
+        flow_height = layout._do_flow_layout(QRect(0, 0, width, 0), items, space_x, space_y, True)
+        assert layout.heightForWidth(width) == flow_height, width
@@ -0,0 +1,117 @@
+import os
+import time
+import threading
+
+import pytest
+from PySide6.QtGui import QColor, QImage
+
+from jeanpaulstartui.utils import icon_cache
+from jeanpaulstartui.utils.icon_cache import IconCache, prune_thumbnails
+
+
+@pytest.fixture
+def cache(qapp):
+    cache = IconCache()
+    cache._thread_pool.waitForDone()
+    return cache
+
+
+@pytest.fixture
+def icon_path(tmp_path):
+    return str(tmp_path / 'icon.png')
+
+
+def _write_icon(icon_path, color, mtime):
+    image = QImage(64, 64, QImage.Format_RGB32)
+    image.fill(QColor(color))
+    image.save(icon_path)
+    os.utime(icon_path, (mtime, mtime))
+
+
+def _request(qapp, cache, icon_path, count=1, changed_only=False):
+    pixmaps = list()
+    cache.request(icon_path, 32, pixmaps.append, changed_only=changed_only)
+    deadline = time.monotonic() + 5
+    while len(pixmaps) < count and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    cache._thread_pool.waitForDone()
+    qapp.processEvents()
+    return [pixmap.toImage().pixelColor(16, 16).name() for pixmap in pixmaps]
+
+
+def _thumbnails():
+    directory = os.path.join(icon_cache._get_thumbnail_directory(), str(icon_cache.THUMBNAIL_CACHE_VERSION))
+    return os.listdir(directory) if os.path.isdir(directory) else list()
+
+
+def test_icons_are_loaded_then_given_from_memory(qapp, cache, icon_path):
+    _write_icon(icon_path, '#ff0000', 1000000)
+    assert _request(qapp, cache, icon_path) == ['#ff0000']
+    assert len(_thumbnails()) == 1
+
+    # given right away, and not again once checked unchanged
+    assert _request(qapp, cache, icon_path) == ['#ff0000']
+
+
+def test_icon_edited_in_place_replaces_its_thumbnail(qapp, cache, icon_path):
+    _write_icon(icon_path, '#ff0000', 1000000)
+    _request(qapp, cache, icon_path)
+
+    _write_icon(icon_path, '#0000ff', 2000000)
+    assert _request(qapp, cache, icon_path, count=2) == ['#ff0000', '#0000ff']
+    assert len(_thumbnails()) == 1
+
+    # a new cache reads the thumbnail, made from the same modification time
+    assert _request(qapp, IconCache(), icon_path) == ['#0000ff']
+
+
+def test_changed_only_gives_only_edited_icons(qapp, cache, icon_path):
+    _write_icon(icon_path, '#ff0000', 1000000)
+    _request(qapp, cache, icon_path)
+    assert _request(qapp, cache, icon_path, changed_only=True) == []
+
+    _write_icon(icon_path, '#0000ff', 2000000)
+    assert _request(qapp, cache, icon_path, changed_only=True) == ['#0000ff']
+
+
+def test_icons_are_not_read_on_the_gui_thread(qapp, cache, icon_path, monkeypatch):
+    _write_icon(icon_path, '#ff0000', 1000000)
+    getmtime = os.path.getmtime
+    threads = set()
+
+    def recording_getmtime(path):
+        threads.add(threading.current_thread())
+        return getmtime(path)
+
+    monkeypatch.setattr(icon_cache.os.path, 'getmtime', recording_getmtime)
+    _request(qapp, cache, icon_path)
+    _request(qapp, cache, icon_path)
+    assert threads and threading.main_thread() not in threads
+
+
+def test_missing_icon_gives_a_placeholder(qapp, cache, tmp_path):
+    pixmaps = list()
+    cache.request(str(tmp_path / 'missing.png'), 32, pixmaps.append)
+    cache._thread_pool.waitForDone()
+    qapp.processEvents()
+    assert len(pixmaps) == 1 and pixmaps[0].width() == 32
+
+
+def test_prune_thumbnails(qapp):
+    thumbnail_directory = icon_cache._get_thumbnail_directory()
+    version_directory = os.path.join(thumbnail_directory, str(icon_cache.THUMBNAIL_CACHE_VERSION))
+    os.makedirs(os.path.join(thumbnail_directory, 'old_version'))
+    os.makedirs(version_directory)
+    with open(os.path.join(thumbnail_directory, 'version_1_thumbnail.png'), 'w'):
+        pass
+    for index in range(5):
+        thumbnail_filepath = os.path.join(version_directory, '{0}.png'.format(index))
+        with open(thumbnail_filepath, 'w'):
+            pass
+        os.utime(thumbnail_filepath, (1000 + index, 1000 + index))
+
+    prune_thumbnails(max_count=3)
+
+    assert os.listdir(thumbnail_directory) == [str(icon_cache.THUMBNAIL_CACHE_VERSION)]
+    assert sorted(os.listdir(version_directory)) == ['2.png', '3.png', '4.png']
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from jeanpaulstartui.utils.launch_telemetry import LaunchTelemetry, load_records
+
+
+def _record(batch, tasks, success=True):
+    return {
+        'batch': batch, 'option': None, 'username': 'user', 'started_at': 0.0,
+        'duration': sum(duration for _, duration in tasks), 'success': success, 'cancelled': False,
+        'tasks': [list(task) for task in tasks]
+    }
+
+
+@pytest.fixture
+def telemetry_filepath(tmp_path):
+    filepath = tmp_path / 'telemetry.jsonl'
+    with open(str(filepath), 'w') as telemetry_file:
+        for duration in range(1, 31):
+            record = _record('Maya', [('copy', float(duration)), ('run', 1.0)])
+            telemetry_file.write(json.dumps(record) + '\n')
+    return str(filepath)
+
+
+def test_estimates_are_given_once_loaded(telemetry_filepath):
+    telemetry = LaunchTelemetry(telemetry_filepath, max_records=100)
+    assert telemetry.estimate('Maya', None) is None
+
+    telemetry.load().join(5)
+    assert telemetry.is_loaded
+    estimate = telemetry.estimate('Maya', None)
+    # median of the last 20 launches
+    assert estimate.tasks == [('copy', 20.5), ('run', 1.0)]
+    assert telemetry.estimate('Nuke', None) is None
+
+
+def test_file_is_compacted_when_loaded(telemetry_filepath):
+    telemetry = LaunchTelemetry(telemetry_filepath, max_records=10)
+    telemetry.load().join(5)
+
+    records = list(load_records(telemetry_filepath))
+    assert len(records) == 10
+    assert records[0]['tasks'][0] == ['copy', 21.0]
+
+
+def test_launches_recorded_while_loading_are_kept(telemetry_filepath):
+    telemetry = LaunchTelemetry(telemetry_filepath, max_records=10)
+    with telemetry._file_lock:
+        thread = telemetry.load()
+        telemetry.record(_record('Nuke', [('run', 2.0)]))
+    thread.join(5)
+    telemetry.flush()
+
+    assert telemetry.estimate('Nuke', None).tasks == [('run', 2.0)]
+    assert [record['batch'] for record in load_records(telemetry_filepath)][-1] == 'Nuke'
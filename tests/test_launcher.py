@@ -0,0 +1,132 @@
+import time
+import pickle
+import threading
+
+import pytest
+
+
+jeanpaulstart = pytest.importorskip('jeanpaulstart')
+
+from jeanpaulstartui import launcher as launcher_module  # noqa: E402
+from jeanpaulstartui.utils import batch_catalog_cache, batch_discovery  # noqa: E402
+
+
+def _wait(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def launcher(qapp, fake_batch, monkeypatch):
+    monkeypatch.setattr(jeanpaulstart, 'load_plugins', lambda: None)
+    monkeypatch.setattr(
+        jeanpaulstart, 'batches_for_user',
+        lambda batch_directories, **kwargs: [fake_batch(batch_directories[0].rsplit('/', 1)[-1])]
+    )
+    launcher = launcher_module.Launcher()
+    launcher.username = 'user'
+    yield launcher
+    launcher._view.close()
+
+
+def test_hung_directory_doesnt_keep_the_process_alive(qapp, launcher, tmp_path, monkeypatch):
+    (tmp_path / 'maya').mkdir()
+    (tmp_path / 'hung').mkdir()
+    directories = [str(tmp_path / 'maya'), str(tmp_path / 'hung')]
+    released = threading.Event()
+    fingerprint = batch_discovery.directory_fingerprint
+
+    def hung_fingerprint(directory):
+        if directory.endswith('hung'):
+            released.wait(10)
+        return fingerprint(directory)
+
+    monkeypatch.setattr(batch_discovery, 'directory_fingerprint', hung_fingerprint)
+    launcher.batch_directories = directories
+    launcher.discovery_timeout = 0.2
+    try:
+        launcher.update()
+        assert _wait(qapp, lambda: not launcher._discoveries)
+
+        assert [batch.name for batch in launcher.batches] == ['maya']
+        assert directories[1] in launcher._degraded_notes
+        discovery_threads = [thread for thread in threading.enumerate() if thread.name == 'jps-discovery']
+        assert discovery_threads and all(thread.daemon for thread in discovery_threads)
+    finally:
+        released.set()
+
+
+def _key_mismatch(launcher):
+    batch_catalog_cache.save_catalog(
+        batch_catalog_cache.catalog_key(launcher.batch_directories, 'other user', None), {'/other': dict()}
+    )
+
+
+def _outdated_version(launcher):
+    batch_catalog_cache.save_catalog(launcher._current_catalog_key(), {'/other': {'batches': ['other']}})
+    with open(batch_catalog_cache._get_batch_catalog_cache_filepath(), 'wb') as cache_file:
+        pickle.dump({'version': batch_catalog_cache.BATCH_CATALOG_CACHE_VERSION - 1,
+                     'key': launcher._current_catalog_key(), 'directories': {'/other': dict()}}, cache_file)
+
+
+def _truncated(launcher):
+    batch_catalog_cache.save_catalog(launcher._current_catalog_key(), {'/other': {'batches': ['other']}})
+    with open(batch_catalog_cache._get_batch_catalog_cache_filepath(), 'rb') as cache_file:
+        content = cache_file.read()
+    with open(batch_catalog_cache._get_batch_catalog_cache_filepath(), 'wb') as cache_file:
+        cache_file.write(content[:len(content) // 2])
+
+
+@pytest.mark.parametrize('spoil_catalog', [_key_mismatch, _outdated_version, _truncated])
+def test_unusable_catalog_falls_back_to_a_discovery(qapp, launcher, tmp_path, spoil_catalog):
+    (tmp_path / 'maya').mkdir()
+    launcher.batch_directories = [str(tmp_path / 'maya')]
+    spoil_catalog(launcher)
+
+    assert not launcher.restore_catalog()
+    launcher.update(use_catalog=True)
+    assert _wait(qapp, lambda: not launcher._discoveries)
+
+    assert [batch.name for batch in launcher.batches] == ['maya']
+    assert batch_catalog_cache.load_catalog(launcher._current_catalog_key())
+
+
+def _status(launcher):
+    view = launcher._view
+    view._flush_status()
+    status_bar = view.status_progress_bar
+    return status_bar.text(), status_bar._progress, status_bar._remaining_time_text, status_bar.toolTip()
+
+
+def test_finished_run_restores_the_status(qapp, launcher, fake_batch, stub_executor):
+    stub_executor(['copy', 'launch'])
+    launcher.version = '4.1.1'
+    launcher.batch_clicked(fake_batch('maya'))
+    assert launcher._view._runs
+
+    assert _wait(qapp, lambda: not launcher._runs)
+    assert _status(launcher) == ('4.1.1', 0, '', '')
+
+
+def test_failed_run_shows_its_error(qapp, launcher, fake_batch, stub_executor):
+    stub_executor(['copy', 'launch'], failing_task='launch')
+    launcher.batch_clicked(fake_batch('maya'))
+
+    assert _wait(qapp, lambda: not launcher._runs)
+    assert _status(launcher) == ('[launch : copy failed]', 0, '', '')
+
+
+def test_cancelled_run_restores_the_status(qapp, launcher, fake_batch, stub_executor):
+    executor = stub_executor(['copy', 'launch'], paused_task='copy')
+    launcher.batch_clicked(fake_batch('maya'))
+    assert executor.paused.wait(5)
+
+    launcher.cancel_run(next(iter(launcher._runs)))
+    executor.resume.set()
+
+    assert _wait(qapp, lambda: not launcher._runs)
+    assert executor.steps == ['copy']
+    assert _status(launcher) == ('maya : cancelled', 0, '', '')
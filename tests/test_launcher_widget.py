@@ -0,0 +1,180 @@
+import os
+import time
+
+import pytest
+import shiboken6
+from PySide6.QtCore import QCoreApplication, QEvent
+from PySide6.QtGui import QColor, QImage
+
+
+@pytest.fixture
+def launcher_widget(qapp):
+    from jeanpaulstartui.view.launcher_widget import LauncherWidget
+    widget = LauncherWidget()
+    yield widget
+    widget.close()
+    widget.deleteLater()
+
+
+def _shown_names(widget):
+    return [button.batch.name for button in widget._batch_buttons if not button.isHidden()]
+
+
+def test_search_hides_and_shows_buttons(qapp, launcher_widget, fake_batch):
+    launcher_widget.populate_layout([
+        fake_batch('Maya', '2024', tags=['3d']),
+        fake_batch('Nuke', '15', description='compositing'),
+        fake_batch('Houdini', '20', tags=['3d', 'fx'])
+    ])
+
+    launcher_widget.search_edit.setText('3d')
+    assert _shown_names(launcher_widget) == ['Maya', 'Houdini']
+
+    launcher_widget.search_edit.setText('compo')
+    assert _shown_names(launcher_widget) == ['Nuke']
+
+    launcher_widget.search_edit.clear()
+    assert _shown_names(launcher_widget) == ['Maya', 'Nuke', 'Houdini']
+
+
+def test_clearing_search_shows_buttons_at_once(qapp, launcher_widget, fake_batch):
+    launcher_widget.populate_layout([fake_batch('Batch {0:04d}'.format(index), '1.0') for index in range(1000)])
+    qapp.processEvents()
+    launcher_widget.search_edit.setText('no batch matches this')
+    assert not _shown_names(launcher_widget)
+
+    start = time.perf_counter()
+    launcher_widget.search_edit.clear()
+    duration = time.perf_counter() - start
+
+    assert len(_shown_names(launcher_widget)) == 1000
+    # with the flow layout laid out on each shown button, it takes seconds
+    assert duration < 1.0
+
+
+def test_search_index_is_built_after_populate(qapp, launcher_widget, fake_batch):
+    launcher_widget.populate_layout([fake_batch('Batch {0:04d}'.format(index)) for index in range(500)])
+    assert launcher_widget._unindexed_batches
+
+    while launcher_widget._unindexed_batches:
+        qapp.processEvents()
+
+    assert len(launcher_widget._search_index) == 500
+    launcher_widget.search_edit.setText('0042')
+    assert _shown_names(launcher_widget) == ['Batch 0042']
+
+
+def test_search_only_touches_buttons_whose_match_changes(qapp, launcher_widget, fake_batch):
+    launcher_widget.populate_layout([fake_batch('Batch {0:04d}'.format(index)) for index in range(200)])
+    launcher_widget.search_edit.setText('batch 00')
+
+    toggled = list()
+    for button in launcher_widget._batch_buttons:
+        button.setVisible = lambda visible, button=button: toggled.append((button.batch.name, visible))
+
+    launcher_widget.search_edit.setText('batch 001')
+    names = ['Batch {0:04d}'.format(index) for index in range(100)]
+    assert sorted(toggled) == [(name, False) for name in names if '001' not in name]
+
+    del toggled[:]
+    launcher_widget.search_edit.setText('batch 001 ')
+    assert not toggled
+
+
+def test_search_hides_rows_of_the_virtual_view(qapp, fake_batch):
+    from jeanpaulstartui.view.launcher_widget import LauncherWidget
+    widget = LauncherWidget(virtual_view=True)
+    try:
+        widget.populate_layout([fake_batch('Maya'), fake_batch('Nuke'), fake_batch('Maya Legacy')])
+        widget.search_edit.setText('maya')
+        assert [widget.batches_view.isRowHidden(row) for row in range(3)] == [False, True, False]
+
+        widget.populate_layout([fake_batch('Nuke')], append=True)
+        assert widget.batches_view.isRowHidden(3)
+
+        widget.search_edit.clear()
+        assert not any(widget.batches_view.isRowHidden(row) for row in range(4))
+    finally:
+        widget.close()
+        widget.deleteLater()
+
+
+def _layout_names(widget):
+    layout = widget.batches_layout
+    return [layout.itemAt(index).widget().batch.name for index in range(layout.count())]
+
+
+def test_buttons_are_reused_inserted_removed_and_reordered(qapp, launcher_widget, fake_batch):
+    launcher_widget.populate_layout([fake_batch('Maya', '2024'), fake_batch('Nuke', '15'), fake_batch('Houdini', '20')])
+    maya, nuke, houdini = launcher_widget._batch_buttons
+
+    launcher_widget.populate_layout([
+        fake_batch('Houdini', '20'), fake_batch('Blender', '4.2'), fake_batch('Maya', '2024')
+    ])
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+    buttons = launcher_widget._batch_buttons
+    assert buttons[0] is houdini
+    assert buttons[2] is maya
+    assert buttons[1] not in (maya, nuke, houdini)
+    assert _layout_names(launcher_widget) == ['Houdini', 'Blender', 'Maya']
+    assert _shown_names(launcher_widget) == ['Houdini', 'Blender', 'Maya']
+    assert not shiboken6.isValid(nuke)
+
+
+def test_changed_key_makes_a_new_button(qapp, launcher_widget, fake_batch):
+    launcher_widget.populate_layout([fake_batch('Maya', '2024')])
+    button = launcher_widget._batch_buttons[0]
+
+    launcher_widget.populate_layout([fake_batch('Maya', '2025')])
+    assert launcher_widget._batch_buttons[0] is not button
+    assert _layout_names(launcher_widget) == ['Maya']
+
+
+def test_reused_button_is_updated(qapp, launcher_widget, fake_batch):
+    launcher_widget.populate_layout([fake_batch('Maya', '2024', description='Maya', stagings=['dev'])])
+    button = launcher_widget._batch_buttons[0]
+    signature = button.menu_signature
+    new_batch = fake_batch('Maya', '2024', description='Maya with plugins', stagings=['dev', 'prod'])
+
+    launcher_widget.populate_layout([new_batch])
+    assert launcher_widget._batch_buttons[0] is button
+    assert button.batch is new_batch
+    assert button.toolTip() == 'Maya with plugins'
+    assert button.menu_signature != signature
+
+    # without stagings, the name is shown as a button: the button is made again
+    launcher_widget.populate_layout([fake_batch('Maya', '2024')])
+    assert launcher_widget._batch_buttons[0] is not button
+    assert launcher_widget._batch_buttons[0].label_as_button
+
+
+def _icon_color(button):
+    image = button.icon_label.pixmap().toImage()
+    return image.pixelColor(image.width() // 2, image.height() // 2).name()
+
+
+def test_icon_edited_in_place_is_shown_again(qapp, launcher_widget, fake_batch, tmp_path):
+    icon_path = str(tmp_path / 'maya.png')
+
+    def write_icon(color, mtime):
+        image = QImage(64, 64, QImage.Format_RGB32)
+        image.fill(QColor(color))
+        image.save(icon_path)
+        os.utime(icon_path, (mtime, mtime))
+
+    write_icon('#ff0000', 1000000)
+    launcher_widget.populate_layout([fake_batch('Maya', icon_path=icon_path)])
+    button = launcher_widget._batch_buttons[0]
+    deadline = time.monotonic() + 5
+    while _icon_color(button) != '#ff0000' and time.monotonic() < deadline:
+        qapp.processEvents()
+    assert _icon_color(button) == '#ff0000'
+
+    write_icon('#0000ff', 2000000)
+    launcher_widget.populate_layout([fake_batch('Maya', icon_path=icon_path)])
+    assert launcher_widget._batch_buttons[0] is button
+    deadline = time.monotonic() + 5
+    while _icon_color(button) != '#0000ff' and time.monotonic() < deadline:
+        qapp.processEvents()
+    assert _icon_color(button) == '#0000ff'
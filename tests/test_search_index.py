@@ -0,0 +1,64 @@
+import pytest
+
+from jeanpaulstartui.view.search_index import BatchSearchIndex
+
+
+@pytest.fixture
+def batches(fake_batch):
+    return [
+        fake_batch('Maya', '2024.1', description='Maya with the studio plugins', tags=['3d', 'anim']),
+        fake_batch('Nuke', '15.0', description='Compositing', tags=['comp']),
+        fake_batch('Houdini', '20.5', description='FX and lighting', tags=['3d', 'fx']),
+        fake_batch('Maya_Legacy', '2022', description='Old pipeline'),
+    ]
+
+
+@pytest.fixture
+def index(batches):
+    return BatchSearchIndex(batches)
+
+
+def test_empty_query_matches_everything(index):
+    assert index.search('') == {0, 1, 2, 3}
+    assert index.search('   ') == {0, 1, 2, 3}
+
+
+def test_short_words_match_word_starts(index):
+    assert index.search('m') == {0, 3}
+    assert index.search('3d') == {0, 2}
+    # 'ya' is inside 'maya', not at the start of a word
+    assert index.search('ya') == frozenset()
+
+
+def test_long_words_match_inside_words(index):
+    assert index.search('compo') == {1}
+    assert index.search('ght') == {2}
+    assert index.search('AYA') == {0, 3}
+    assert index.search('unknown') == frozenset()
+
+
+def test_every_word_must_match(index):
+    assert index.search('maya plugins') == {0}
+    assert index.search('3d fx') == {2}
+    assert index.search('maya fx') == frozenset()
+
+
+def test_words_with_separators_match_the_whole_text(index):
+    assert index.search('maya_leg') == {3}
+    assert index.search('2024.1') == {0}
+    assert index.search('20.5') == {2}
+    assert index.search('studio_plugins') == frozenset()
+
+
+def test_repeated_searches_are_cached(index):
+    first = index.search('houdini')
+    assert index.search('houdini') is first
+
+
+def test_batches_added_later_are_found(batches):
+    index = BatchSearchIndex(batches[:2])
+    assert index.search('maya') == {0}
+    index.add(batches[2:])
+    assert len(index) == 4
+    assert index.search('maya') == {0, 3}
+    assert index.search('3d') == {0, 2}